@@ -2,73 +2,390 @@
 
 Caches fetched pages by URL hash and classification results by content hash.
 All cache files are stored under pipeline/.cache/ (gitignored).
+
+Keys are 64-bit BLAKE2b digests (16 hex chars). These are not security
+tokens, so we ask for an 8-byte digest directly instead of computing a
+full SHA-256 and throwing most of it away.
+
+Files are sharded into 256 subdirectories by the first two hex chars of
+their key (e.g. pages/3f/3fa2...html) so no single directory grows large.
+
+Older caches (before BLAKE2b keys and sharding) hold flat <sha256[:16]>.<ext>
+files. The page and classification getters accept the original key
+string as `legacy_source`; on a miss they try that flat file and copy
+a hit into the current layout, so old entries are not re-fetched or
+re-paid for.
 """
 from __future__ import annotations
 
 import hashlib
 import json
 import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Generic, Optional, TypeVar
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Bound once at import — these are called on every cache lookup
+_blake2b = hashlib.blake2b
+_KEY_BYTES = 8
+
 
 def content_hash(content: str) -> str:
     """Hash content for cache key (classification results)."""
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+    return _blake2b(content.encode(), digest_size=_KEY_BYTES).hexdigest()
 
 
+@lru_cache(maxsize=4096)
 def url_hash(url: str) -> str:
     """Hash URL for cache key (fetched pages)."""
-    return hashlib.sha256(url.encode()).hexdigest()[:16]
+    return _blake2b(url.encode(), digest_size=_KEY_BYTES).hexdigest()
+
+
+def request_key(
+    url: str,
+    json_body: Optional[dict] = None,
+    params: Optional[dict] = None,
+) -> str:
+    """Cache key for an HTTP request, hashed incrementally.
+
+    Feeds the URL and the canonical body/params JSON into one hasher
+    instead of building the concatenated string first. The digest equals
+    url_hash(url + sep + json) — for a plain GET it is url_hash(url) — so
+    existing page cache entries stay valid. When both are given, params
+    win, as they always have.
+    """
+    h = _blake2b(url.encode(), digest_size=_KEY_BYTES)
+    if params:
+        h.update(b"?")
+        h.update(json.dumps(params, sort_keys=True).encode())
+    elif json_body:
+        h.update(b"|")
+        h.update(json.dumps(json_body, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def legacy_key(source: str) -> str:
+    """Key the cache used before BLAKE2b and sharding (flat files)."""
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+def legacy_request_source(
+    url: str,
+    json_body: Optional[dict] = None,
+    params: Optional[dict] = None,
+) -> str:
+    """The string the old page cache hashed for a request (see request_key)."""
+    if params:
+        return url + "?" + json.dumps(params, sort_keys=True)
+    if json_body:
+        return url + "|" + json.dumps(json_body, sort_keys=True)
+    return url
+
+
+def cache_path(cache_dir: Path, key: str, suffix: str) -> Path:
+    """Location of a cache entry: <cache_dir>/<key[:2]>/<key><suffix>."""
+    return cache_dir / key[:2] / f"{key}{suffix}"
+
+
+def _is_shard(name: str) -> bool:
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+def write_cache_file(path: Path, data: bytes) -> None:
+    """Write bytes to a cache file with raw os.write calls.
+
+    Skips the buffered/text I/O layers — usually a single write syscall.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 
 def get_cached_page(cache_dir: Path, url: str) -> Optional[str]:
     """Retrieve a cached page by URL. Returns None on cache miss."""
-    cache_file = cache_dir / f"{url_hash(url)}.html"
-    if cache_file.exists():
-        logger.debug("Cache HIT (page): %s", url)
-        return cache_file.read_text(encoding="utf-8")
-    logger.debug("Cache MISS (page): %s", url)
-    return None
+    return get_cached_page_by_key(cache_dir, url_hash(url), legacy_source=url)
+
+
+def get_cached_page_by_key(
+    cache_dir: Path, key: str, legacy_source: Optional[str] = None,
+) -> Optional[str]:
+    """Retrieve a cached page by a precomputed key (see request_key).
+
+    `legacy_source` is the request's old key string
+    (legacy_request_source), used to find entries from the flat layout.
+    """
+    content = _read_page(cache_dir, key, legacy_source)
+    return content.decode("utf-8") if content is not None else None
+
+
+def get_cached_page_bytes(cache_dir: Path, url: str) -> Optional[bytes]:
+    """Retrieve a cached page as raw UTF-8 bytes, skipping the str decode.
+
+    Use this when the content goes straight to an HTML parser. Repeat
+    hits within a process are served from memory.
+    """
+    return _read_page(cache_dir, url_hash(url), legacy_source=url)
+
+
+class FileMemo(Generic[T]):
+    """Bounded in-process LRU of loaded cache files, keyed by path.
+
+    Like lru_cache, except a save evicts only the file it rewrote
+    (discard) instead of every warm entry. Misses raise from `load` and
+    are never stored. Safe to share between threads.
+    """
+
+    def __init__(self, load: Callable[[Path], T], maxsize: int) -> None:
+        self._load = load
+        self.maxsize = maxsize
+        self.hits = 0
+        self._entries: OrderedDict[Path, T] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by discard/clear, so a load that raced a save is not stored
+        self._generation = 0
+
+    def __call__(self, path: Path) -> T:
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return self._entries[path]
+            generation = self._generation
+        value = self._load(path)  # outside the lock — this is the slow part
+        with self._lock:
+            if generation == self._generation:
+                self._entries[path] = value
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def discard(self, path: Path) -> None:
+        """Forget one file, e.g. right after rewriting it."""
+        with self._lock:
+            self._entries.pop(path, None)
+            self._generation += 1
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self._generation += 1
+
+
+def _read_page(
+    cache_dir: Path, key: str, legacy_source: Optional[str] = None,
+) -> Optional[bytes]:
+    cache_file = cache_path(cache_dir, key, ".html")
+    try:
+        content = _load_page(cache_file)
+    except FileNotFoundError:
+        content = None
+        if legacy_source is not None:
+            content = _migrate_legacy_page(cache_dir, cache_file, legacy_source)
+        if content is None:
+            logger.debug("Cache MISS (page): %s", key)
+            return None
+    logger.debug("Cache HIT (page): %s", key)
+    return content
+
+
+# Pages can be large, so this memo is kept smaller than the others
+_load_page: FileMemo[bytes] = FileMemo(Path.read_bytes, maxsize=256)
+
+
+def _migrate_legacy_page(
+    cache_dir: Path, cache_file: Path, legacy_source: str,
+) -> Optional[bytes]:
+    """Copy a flat-layout page into its current location. None if absent."""
+    try:
+        content = (cache_dir / f"{legacy_key(legacy_source)}.html").read_bytes()
+    except FileNotFoundError:
+        return None
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    write_cache_file(cache_file, content)
+    _load_page.discard(cache_file)
+    logger.info("Migrated legacy page: %s", cache_file.name)
+    return content
 
 
 def save_cached_page(cache_dir: Path, url: str, content: str) -> Path:
     """Save a fetched page to disk cache."""
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_file = cache_dir / f"{url_hash(url)}.html"
-    cache_file.write_text(content, encoding="utf-8")
-    logger.info("Cached page: %s -> %s", url, cache_file.name)
+    return save_cached_page_by_key(cache_dir, url_hash(url), content)
+
+
+def save_cached_page_by_key(cache_dir: Path, key: str, content: str) -> Path:
+    """Save a fetched page under a precomputed key (see request_key)."""
+    cache_file = cache_path(cache_dir, key, ".html")
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    write_cache_file(cache_file, content.encode("utf-8"))
+    _load_page.discard(cache_file)
+    logger.info("Cached page: %s", cache_file.name)
     return cache_file
 
 
 def get_cached_classification(cache_dir: Path, raw_text: str) -> Optional[dict]:
     """Retrieve a cached classification result by content hash."""
-    cache_file = cache_dir / f"{content_hash(raw_text)}.json"
-    if cache_file.exists():
-        logger.debug("Cache HIT (classification): %s", cache_file.name)
-        return json.loads(cache_file.read_text(encoding="utf-8"))
-    logger.debug("Cache MISS (classification): %s", cache_file.name)
-    return None
+    return get_cached_classification_by_key(
+        cache_dir, content_hash(raw_text), legacy_source=raw_text,
+    )
+
+
+def get_cached_classification_by_key(
+    cache_dir: Path, key: str, legacy_source: Optional[str] = None,
+) -> Optional[dict]:
+    """Retrieve a cached classification result by a precomputed content hash.
+
+    Repeat hits within a process are served from memory; the returned
+    dict is shared, so callers must not mutate it. `legacy_source` is the
+    classified text, used to find entries from the flat layout.
+    """
+    cache_file = cache_path(cache_dir, key, ".json")
+    try:
+        result = _load_classification(cache_file)
+    except FileNotFoundError:
+        result = None
+        if legacy_source is not None:
+            result = _migrate_legacy_classification(cache_dir, cache_file, legacy_source)
+        if result is None:
+            logger.debug("Cache MISS (classification): %s", cache_file.name)
+            return None
+    logger.debug("Cache HIT (classification): %s", cache_file.name)
+    return result
+
+
+def _read_classification(cache_file: Path) -> dict:
+    return json.loads(cache_file.read_bytes())
+
+
+_load_classification: FileMemo[dict] = FileMemo(_read_classification, maxsize=512)
+
+
+def _migrate_legacy_classification(
+    cache_dir: Path, cache_file: Path, legacy_source: str,
+) -> Optional[dict]:
+    """Copy a flat-layout classification into its current location."""
+    try:
+        result = _read_classification(cache_dir / f"{legacy_key(legacy_source)}.json")
+    except FileNotFoundError:
+        return None
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    _write_classification(cache_file, result)
+    logger.info("Migrated legacy classification: %s", cache_file.name)
+    return result
 
 
 def save_cached_classification(cache_dir: Path, raw_text: str, result: dict) -> Path:
     """Save a classification result to disk cache."""
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_file = cache_dir / f"{content_hash(raw_text)}.json"
-    cache_file.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return save_cached_classification_by_key(cache_dir, content_hash(raw_text), result)
+
+
+def save_cached_classification_by_key(cache_dir: Path, key: str, result: dict) -> Path:
+    """Save a classification result under a precomputed content hash."""
+    cache_file = cache_path(cache_dir, key, ".json")
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    _write_classification(cache_file, result)
     logger.info("Cached classification: %s", cache_file.name)
     return cache_file
 
 
+def _write_classification(cache_file: Path, result: dict) -> None:
+    # Machine-read only — compact separators, no pretty-printing
+    data = json.dumps(result, separators=(",", ":"), ensure_ascii=False)
+    write_cache_file(cache_file, data.encode("utf-8"))
+    _load_classification.discard(cache_file)
+
+
+class ClassificationCacheWriter:
+    """Buffers classification results and writes them to disk in batches.
+
+    Lookups check the pending buffer before disk, so a result is visible
+    as soon as it is added. Pending entries are written every
+    `flush_every` additions and on an explicit flush(), which the owner
+    must call when done — at most a handful of paid API results can be
+    lost on a crash. Safe to share between threads.
+    """
+
+    def __init__(self, cache_dir: Path, flush_every: int = 25) -> None:
+        self.cache_dir = cache_dir
+        self.flush_every = flush_every
+        self._pending: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, legacy_source: Optional[str] = None) -> Optional[dict]:
+        """Look up a result by content hash, pending entries first.
+
+        `legacy_source` is passed through to get_cached_classification_by_key.
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            logger.debug("Cache HIT (classification, pending): %s", key)
+            return pending
+        return get_cached_classification_by_key(
+            self.cache_dir, key, legacy_source=legacy_source,
+        )
+
+    def add(self, key: str, result: dict) -> None:
+        """Queue a result for writing; flushes once the buffer is full."""
+        with self._lock:
+            self._pending[key] = result
+            full = len(self._pending) >= self.flush_every
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending entries to disk. Returns count written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            made: set[Path] = set()
+            for key, result in self._pending.items():
+                cache_file = cache_path(self.cache_dir, key, ".json")
+                if cache_file.parent not in made:
+                    cache_file.parent.mkdir(parents=True, exist_ok=True)
+                    made.add(cache_file.parent)
+                _write_classification(cache_file, result)
+            count = len(self._pending)
+            self._pending.clear()
+        logger.info("Flushed %d cached classifications to %s", count, self.cache_dir)
+        return count
+
+
 def clear_cache(cache_dir: Path) -> int:
-    """Delete all cached files in a directory. Returns count of files deleted."""
-    count = 0
-    if cache_dir.exists():
-        for f in cache_dir.glob("*"):
-            if f.is_file():
-                f.unlink()
-                count += 1
+    """Delete all cached files in a directory. Returns count of files deleted.
+
+    Clears top-level files and the contents of shard directories; any
+    other subdirectories are left alone. os.scandir reports file type from
+    the directory listing itself, so there is no extra stat per entry.
+    """
+    _load_classification.cache_clear()
+    _load_page.cache_clear()
+    count = _unlink_files(cache_dir, descend_shards=True)
     logger.info("Cleared %d cached files from %s", count, cache_dir)
     return count
+
+
+def _unlink_files(directory: Path, descend_shards: bool = False) -> int:
+    count = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    os.unlink(entry.path)
+                    count += 1
+                elif descend_shards and entry.is_dir(follow_symlinks=False) and _is_shard(entry.name):
+                    count += _unlink_files(Path(entry.path))
+    except FileNotFoundError:
+        pass
+    return count
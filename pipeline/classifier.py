@@ -15,23 +15,29 @@ from __future__ import annotations
 import json
 import logging
 import os
+import re
 import sys
-from typing import List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
 
 from pydantic import ValidationError
 
 from pipeline.cache import (
+    ClassificationCacheWriter,
     clear_cache,
     content_hash,
-    get_cached_classification,
-    save_cached_classification,
 )
 from pipeline.config import (
+    BATCH_MAX_WAIT_SECONDS,
+    BATCH_POLL_SECONDS,
     CLASSIFICATION_CACHE_DIR,
-    COUNTRY_WATCHLIST,
+    CLASSIFY_MAX_WORKERS,
+    COUNTRY_CODE_TO_FORMAL,
     DEFAULT_MODEL,
     MAX_INPUT_TOKENS,
-    PREFILTER_KEYWORDS,
+    PREFILTER_KEYWORDS_LOWER,
     PREMIUM_MODEL,
 )
 from pipeline.models import CostOptimization, Deal, DealStatus, DealType, RawDeal, SourceDocument
@@ -41,6 +47,11 @@ logger = logging.getLogger(__name__)
 
 # === Layer 1: Pre-filter ===
 
+# All keywords folded into one alternation so the text is scanned once
+# instead of once per keyword.
+_PREFILTER_RE = re.compile("|".join(re.escape(kw) for kw in PREFILTER_KEYWORDS_LOWER))
+
+
 def passes_prefilter(raw: RawDeal) -> bool:
     """Keyword-based pre-filter. Returns True if the deal looks relevant.
 
@@ -48,15 +59,34 @@ def passes_prefilter(raw: RawDeal) -> bool:
     Skips pages that clearly aren't about tech deals.
     """
     text = f"{raw.title} {raw.snippet}".lower()
-    for kw in PREFILTER_KEYWORDS:
-        if kw.lower() in text:
-            return True
+    if _PREFILTER_RE.search(text) is not None:
+        return True
     logger.debug("Pre-filter REJECTED: %s", raw.title[:60])
     return False
 
 
 # === Layer 2: Truncation ===
 
+_WORD_RE = re.compile(r"\S+")
+_LINE_RE = re.compile(r"^.*$", re.MULTILINE)
+# Markers of a deal-detail line: dollar amounts, bullets, dashes
+_DETAIL_RE = re.compile(r"[$•—-]|billion|million")
+
+
+def _word_cutoff(text: str, limit: int, pos: int = 0) -> Optional[int]:
+    """Return the index just past the `limit`-th word of text[pos:].
+
+    Returns None if there are no more than `limit` words, so callers can
+    tell "fits" from "needs cutting" without building a word list.
+    """
+    end = pos
+    for count, match in enumerate(_WORD_RE.finditer(text, pos), start=1):
+        if count > limit:
+            return end
+        end = match.end()
+    return None
+
+
 def truncate_text(text: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
     """Smart truncation: keep beginning + key sections.
 
@@ -64,30 +94,52 @@ def truncate_text(text: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
     Preserves first section (usually the key summary) and any bullet points
     (often contain deal details like dollar values and company names).
     """
-    words = text.split()
-    if len(words) <= max_tokens:
+    if _word_cutoff(text, max_tokens) is None:
         return text
 
-    # Strategy: keep first 500 words + scan for bullet-point lines
-    first_chunk = " ".join(words[:500])
+    # Strategy: keep first 500 words + scan for bullet-point lines.
+    # Words are re-joined with single spaces, as text.split() did, so the
+    # output (and its content_hash cache key) is unchanged.
+    head_words = min(500, max_tokens)
+    first_chunk = " ".join(_WORD_RE.findall(text, 0, _word_cutoff(text, head_words)))
+    remaining = max_tokens - head_words - 1  # "---" separator counts as a word
+    if remaining < 0:
+        return first_chunk
+
+    # Skip first few lines (already in first_chunk)
+    pos = 0
+    for _ in range(5):
+        pos = text.find("\n", pos) + 1
+        if pos == 0:
+            pos = len(text)
+            break
 
     # Find lines that look like deal details (contain $, numbers, company-like patterns)
-    lines = text.split("\n")
-    detail_lines = []
-    for line in lines[5:]:  # Skip first few lines (already in first_chunk)
-        stripped = line.strip()
-        if any(marker in stripped for marker in ["$", "billion", "million", "—", "•", "-"]):
-            if len(stripped) > 20:
-                detail_lines.append(stripped)
-
-    # Combine, staying under token budget
-    detail_text = "\n".join(detail_lines[:20])  # Cap at 20 detail lines
-    combined = first_chunk + "\n\n---\n\n" + detail_text
-    combined_words = combined.split()
-    if len(combined_words) > max_tokens:
-        combined = " ".join(combined_words[:max_tokens])
-
-    logger.debug("Truncated from %d to %d tokens", len(words), len(combined.split()))
+    detail_lines: List[str] = []
+    over_budget = False
+    for match in _LINE_RE.finditer(text, pos):
+        if len(detail_lines) >= 20:  # Cap at 20 detail lines
+            break
+        stripped = match.group().strip()
+        if len(stripped) <= 20:
+            continue
+        if _DETAIL_RE.search(stripped) is None:
+            continue
+        # Stay under token budget, cutting the last line mid-way if needed
+        cutoff = _word_cutoff(stripped, remaining)
+        if cutoff is not None:
+            detail_lines.append(stripped[:cutoff])
+            over_budget = True
+            break
+        remaining -= sum(1 for _ in _WORD_RE.finditer(stripped))
+        detail_lines.append(stripped)
+
+    combined = first_chunk + "\n\n---\n\n" + "\n".join(detail_lines)
+    if over_budget:
+        # A cut result was always re-joined word by word
+        combined = " ".join(_WORD_RE.findall(combined))
+        remaining = 0
+    logger.debug("Truncated to %d tokens", max_tokens - remaining)
     return combined
 
 
@@ -136,6 +188,17 @@ IMPORTANT:
 - If a detail is not mentioned, use null
 - Return ONLY the JSON, no markdown or explanation"""
 
+# Split around {text} once so each call is plain concatenation, not a
+# re-parse of the template's ~60 escaped braces
+_PROMPT_PREFIX, _PROMPT_SUFFIX = (
+    part.replace("{{", "{").replace("}}", "}") for part in EXTRACTION_PROMPT.split("{text}")
+)
+
+
+def _build_prompt(text: str) -> str:
+    """Fill EXTRACTION_PROMPT with page text."""
+    return _PROMPT_PREFIX + text + _PROMPT_SUFFIX
+
 
 class Classifier:
     """Classifies raw deals into structured Deal objects using Claude API."""
@@ -151,7 +214,8 @@ class Classifier:
         self.prefilter_enabled = prefilter_enabled
         self.truncation_enabled = truncation_enabled
         self.batch_mode = batch_mode
-        self._client = None
+        self._stats_lock = threading.Lock()
+        self._cache = ClassificationCacheWriter(CLASSIFICATION_CACHE_DIR)
         self.stats = CostOptimization(
             model_used=model,
             prefilter_enabled=prefilter_enabled,
@@ -160,25 +224,8 @@ class Classifier:
         )
 
     def _get_client(self):
-        """Lazy-initialize Anthropic client."""
-        if self._client is None:
-            try:
-                from anthropic import Anthropic
-            except ImportError:
-                logger.error("anthropic package not installed. Run: pip install anthropic")
-                sys.exit(1)
-
-            api_key = os.environ.get("ANTHROPIC_API_KEY")
-            if not api_key:
-                logger.error("ANTHROPIC_API_KEY not set")
-                print("\n\u274c  ANTHROPIC_API_KEY not set.")
-                print("   Set it: export ANTHROPIC_API_KEY='sk-ant-...'")
-                print("   Add to ~/.zshrc for persistence.")
-                print("   Or use --dry-run / --fetch-only to skip classification.\n")
-                sys.exit(1)
-            logger.info("API key present: \u2713")
-            self._client = Anthropic(api_key=api_key)
-        return self._client
+        """Return the process-wide Anthropic client."""
+        return _get_anthropic_client()
 
     def classify_page(
         self,
@@ -192,20 +239,13 @@ class Classifier:
         Returns (parent_deal_or_none, list_of_child_deals).
         A single API call extracts both parent and children — token efficient.
         """
-        # Layer 1: Pre-filter
-        if self.prefilter_enabled and not passes_prefilter(raw):
-            self.stats.prefilter_skipped += 1
+        prepared = self._prepare(raw, page_text)
+        if prepared is None:
             return None, []
+        text, key = prepared
 
-        # Layer 2: Truncation
-        text = page_text
-        if self.truncation_enabled:
-            text = truncate_text(text)
-
-        # Layer 4: Cache check (before API call)
-        cached = get_cached_classification(CLASSIFICATION_CACHE_DIR, text)
+        cached = self._get_cached(key, text)
         if cached is not None:
-            self.stats.cache_hits += 1
             return self._parse_result(cached, raw, parent_id_prefix, deal_counter)
 
         # Layer 3: API call (model already selected)
@@ -213,16 +253,235 @@ class Classifier:
         if result is None:
             return None, []
 
-        # Save to Layer 4 cache
-        save_cached_classification(CLASSIFICATION_CACHE_DIR, text, result)
-        self.stats.new_api_calls += 1
+        # Save to Layer 4 cache (buffered — see flush_cache)
+        self._cache.add(key, result)
+        with self._stats_lock:
+            self.stats.new_api_calls += 1
 
         return self._parse_result(result, raw, parent_id_prefix, deal_counter)
 
+    def _prepare(self, raw: RawDeal, page_text: str) -> Optional[Tuple[str, str]]:
+        """Run Layers 1-2. Returns (text, cache_key), or None if pre-filtered."""
+        # Layer 1: Pre-filter
+        if self.prefilter_enabled and not passes_prefilter(raw):
+            with self._stats_lock:
+                self.stats.prefilter_skipped += 1
+            return None
+
+        # Layer 2: Truncation
+        text = page_text
+        if self.truncation_enabled:
+            text = truncate_text(text)
+
+        # Hash once — the same key is used for the Layer 4 lookup and save
+        return text, content_hash(text)
+
+    def _get_cached(self, key: str, text: str) -> Optional[dict]:
+        """Layer 4: cache check (before API call).
+
+        `text` lets entries cached under the old flat layout still hit.
+        """
+        cached = self._cache.get(key, legacy_source=text)
+        if cached is not None:
+            with self._stats_lock:
+                self.stats.cache_hits += 1
+        return cached
+
+    def classify_pages(
+        self,
+        items: List[Tuple[RawDeal, str, int]],
+        parent_id_prefix: str,
+        max_workers: int = CLASSIFY_MAX_WORKERS,
+    ) -> List[Union[Tuple[Optional[Deal], List[Deal]], Exception]]:
+        """Classify many (raw, page_text, deal_counter) items concurrently.
+
+        Each API call is a network round-trip, so cache misses are spread
+        over a thread pool — one call per distinct page text, so duplicate
+        pages in a run are only paid for once. Results come back in input
+        order; a page that raised is returned as its exception so one
+        failure doesn't sink the rest. In batch mode, delegates to
+        classify_pages_batch().
+        """
+        if self.batch_mode:
+            return self.classify_pages_batch(items, parent_id_prefix)
+
+        prepared = [self._prepare(raw, page_text) for raw, page_text, _ in items]
+        results, misses = self._resolve_cached(prepared)
+        if misses:
+            results.update(self._call_api_many(misses, max_workers))
+        return self._assemble(items, prepared, results, parent_id_prefix)
+
+    def classify_pages_batch(
+        self,
+        items: List[Tuple[RawDeal, str, int]],
+        parent_id_prefix: str,
+    ) -> List[Union[Tuple[Optional[Deal], List[Deal]], Exception]]:
+        """Layer 5: classify cache misses through the Message Batches API.
+
+        All uncached pages go out in one batch (50% cheaper), keyed by
+        content hash so identical pages are only sent once. Blocks until
+        the batch ends; any entry that didn't succeed is retried with a
+        regular API call.
+        """
+        prepared = [self._prepare(raw, page_text) for raw, page_text, _ in items]
+        results, misses = self._resolve_cached(prepared)
+        if misses:
+            results.update(self._run_batch(misses))
+        return self._assemble(items, prepared, results, parent_id_prefix)
+
+    def _resolve_cached(
+        self, prepared: List[Optional[Tuple[str, str]]],
+    ) -> Tuple[dict, dict[str, str]]:
+        """Layer 4 for many pages: (results by key, uncached texts by key).
+
+        Each distinct key is looked up once, however many pages share it.
+        """
+        results: dict = {}
+        misses: dict[str, str] = {}
+        for entry in prepared:
+            if entry is None:
+                continue
+            text, key = entry
+            if key in results or key in misses:
+                continue
+            cached = self._get_cached(key, text)
+            if cached is not None:
+                results[key] = cached
+            else:
+                misses[key] = text
+        return results, misses
+
+    def _assemble(
+        self,
+        items: List[Tuple[RawDeal, str, int]],
+        prepared: List[Optional[Tuple[str, str]]],
+        results: dict,
+        parent_id_prefix: str,
+    ) -> List[Union[Tuple[Optional[Deal], List[Deal]], Exception]]:
+        """Turn per-key results back into per-item output, in input order."""
+        output: List[Union[Tuple[Optional[Deal], List[Deal]], Exception]] = []
+        for (raw, _page_text, deal_counter), entry in zip(items, prepared):
+            data = results.get(entry[1]) if entry is not None else None
+            if isinstance(data, Exception):
+                output.append(data)
+                continue
+            if data is None:
+                output.append((None, []))
+                continue
+            try:
+                output.append(self._parse_result(data, raw, parent_id_prefix, deal_counter))
+            except Exception as e:
+                output.append(e)
+        return output
+
+    def _call_api_many(
+        self, texts_by_key: dict[str, str], max_workers: int,
+    ) -> dict[str, Union[Optional[dict], Exception]]:
+        """Layer 3 over a thread pool; caches what comes back."""
+        def _call(text: str) -> Union[Optional[dict], Exception]:
+            try:
+                return self._call_api(text)
+            except Exception as e:
+                return e
+
+        workers = min(max_workers, len(texts_by_key))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(texts_by_key, executor.map(_call, texts_by_key.values())))
+
+        for key, result in results.items():
+            if isinstance(result, dict):
+                self._cache.add(key, result)
+                with self._stats_lock:
+                    self.stats.new_api_calls += 1
+        return results
+
+    def _run_batch(
+        self, texts_by_key: dict[str, str],
+    ) -> dict[str, Union[Optional[dict], Exception]]:
+        """Classify through one batch, falling back to direct calls.
+
+        Entries that errored, expired or didn't parse — or every entry, if
+        submitting or polling the batch fails or runs past
+        BATCH_MAX_WAIT_SECONDS — are retried with regular API calls. A batch
+        abandoned after submission is cancelled first, so pages aren't paid
+        for twice.
+        """
+        try:
+            results = self._collect_batch(texts_by_key)
+        except Exception as e:
+            logger.error(
+                "Batch failed, classifying %d pages directly: %s", len(texts_by_key), e,
+            )
+            results = {}
+
+        for key, result in results.items():
+            self._cache.add(key, result)
+            with self._stats_lock:
+                self.stats.new_api_calls += 1
+
+        remaining = {key: text for key, text in texts_by_key.items() if key not in results}
+        if remaining:
+            results.update(self._call_api_many(remaining, CLASSIFY_MAX_WORKERS))
+        return results
+
+    def _collect_batch(self, texts_by_key: dict[str, str]) -> dict[str, Optional[dict]]:
+        """Submit one batch and wait for it; cancels it if waiting fails."""
+        client = self._get_client()
+        batch = client.messages.batches.create(requests=[
+            {
+                "custom_id": key,
+                "params": {
+                    "model": self.model,
+                    "max_tokens": 2048,
+                    "messages": [{"role": "user", "content": _build_prompt(text)}],
+                },
+            }
+            for key, text in texts_by_key.items()
+        ])
+        logger.info("Submitted batch %s with %d requests", batch.id, len(texts_by_key))
+
+        try:
+            return self._wait_for_batch(client, batch)
+        except Exception:
+            # The caller re-sends these pages directly; cancel the batch so
+            # its unfinished requests aren't billed a second time.
+            try:
+                client.messages.batches.cancel(batch.id)
+                logger.warning("Cancelled batch %s before falling back", batch.id)
+            except Exception as e:
+                logger.error("Could not cancel batch %s: %s", batch.id, e)
+            raise
+
+    def _wait_for_batch(self, client, batch) -> dict[str, Optional[dict]]:
+        """Poll a submitted batch until it ends. Returns parsed successes by key."""
+        deadline = time.monotonic() + BATCH_MAX_WAIT_SECONDS
+        while batch.processing_status != "ended":
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"batch {batch.id} not ended after {BATCH_MAX_WAIT_SECONDS}s"
+                )
+            time.sleep(BATCH_POLL_SECONDS)
+            batch = client.messages.batches.retrieve(batch.id)
+            logger.info("Batch %s: %s", batch.id, batch.processing_status)
+
+        results: dict[str, Optional[dict]] = {}
+        for entry in client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                logger.warning("Batch entry %s %s", entry.custom_id, entry.result.type)
+                continue
+            parsed = _parse_response_text(entry.result.message.content[0].text)
+            if parsed is not None:
+                results[entry.custom_id] = parsed
+        return results
+
+    def flush_cache(self) -> None:
+        """Write any buffered classification results to disk."""
+        self._cache.flush()
+
     def _call_api(self, text: str) -> Optional[dict]:
         """Make the Anthropic API call. Returns parsed JSON or None."""
         client = self._get_client()
-        prompt = EXTRACTION_PROMPT.format(text=text)
+        prompt = _build_prompt(text)
 
         try:
             response = client.messages.create(
@@ -230,17 +489,7 @@ class Classifier:
                 max_tokens=2048,
                 messages=[{"role": "user", "content": prompt}],
             )
-            content = response.content[0].text
-
-            # Strip markdown code fences if present
-            if content.startswith("```"):
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1])
-
-            return json.loads(content)
-        except json.JSONDecodeError as e:
-            logger.error("Invalid JSON from API: %s", e)
-            return None
+            return _parse_response_text(response.content[0].text)
         except Exception as e:
             logger.error("API call failed: %s", e)
             return None
@@ -332,12 +581,56 @@ class Classifier:
         return cost
 
 
+_anthropic_client = None
+_anthropic_client_lock = threading.Lock()
+
+
+def _get_anthropic_client():
+    """Lazy-initialize one Anthropic client per process.
+
+    Shared by every Classifier and worker thread so they all reuse the
+    SDK's keep-alive connection pool instead of each opening their own.
+    """
+    global _anthropic_client
+    with _anthropic_client_lock:
+        if _anthropic_client is None:
+            try:
+                from anthropic import Anthropic
+            except ImportError:
+                logger.error("anthropic package not installed. Run: pip install anthropic")
+                sys.exit(1)
+
+            api_key = os.environ.get("ANTHROPIC_API_KEY")
+            if not api_key:
+                logger.error("ANTHROPIC_API_KEY not set")
+                print("\n\u274c  ANTHROPIC_API_KEY not set.")
+                print("   Set it: export ANTHROPIC_API_KEY='sk-ant-...'")
+                print("   Add to ~/.zshrc for persistence.")
+                print("   Or use --dry-run / --fetch-only to skip classification.\n")
+                sys.exit(1)
+            logger.info("API key present: \u2713")
+            _anthropic_client = Anthropic(api_key=api_key)
+    return _anthropic_client
+
+
+def _parse_response_text(content: str) -> Optional[dict]:
+    """Parse the model's JSON reply. Returns None if it isn't valid JSON."""
+    # Strip markdown code fences if present — slice, don't split into lines
+    if content.startswith("```"):
+        start = content.find("\n") + 1
+        end = content.rfind("```")
+        content = content[start:end] if end >= start else content[start:]
+
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        logger.error("Invalid JSON from API: %s", e)
+        return None
+
+
 def _country_name_from_code(code: str) -> str:
     """Look up full country name from ISO code."""
-    for _key, info in COUNTRY_WATCHLIST.items():
-        if info["code"] == code:
-            return info.get("formal_name", _key)
-    return code
+    return COUNTRY_CODE_TO_FORMAL.get(code, code)
 
 
 # === Standalone test mode ===
@@ -380,6 +673,7 @@ if __name__ == "__main__":
         )
         classifier = Classifier()
         parent, children = classifier.classify_page(raw, sample_text, "tpd-kor", 1)
+        classifier.flush_cache()
         if parent:
             print(f"\nParent: {parent.title}")
             print(f"  Country: {parent.country}, Value: {parent.deal_value_usd}")
@@ -22,6 +22,11 @@ REQUEST_DELAY_SECONDS = 1.5
 BACKOFF_START_SECONDS = 10
 MAX_RETRIES = 3
 REQUEST_TIMEOUT_SECONDS = 30
+FETCH_MAX_WORKERS = 8  # Concurrent article fetches per listing page
+FR_SEARCH_MAX_WORKERS = 4  # Concurrent per-country Federal Register searches
+HTTP_MAX_CONNECTIONS = 64  # Shared client pool, across all scrapers
+HTTP_MAX_KEEPALIVE = 32
+HTTP_CONNECT_RETRIES = 2  # Quick transport-level retries on connect failures
 
 # === Country Watchlist ===
 # Adding a new country = one entry here. All scrapers pick it up automatically.
@@ -54,18 +59,25 @@ COUNTRY_WATCHLIST: dict[str, dict] = {
     },
 }
 
+# ISO code -> formal name, for building parent deal parties
+COUNTRY_CODE_TO_FORMAL: dict[str, str] = {
+    info["code"]: info.get("formal_name", key) for key, info in COUNTRY_WATCHLIST.items()
+}
+
 # === Search Keywords ===
+# Roughly most-frequent first: matchers try them in order, so common
+# hits exit early.
 TECH_KEYWORDS = [
-    "technology", "AI", "artificial intelligence", "semiconductor", "quantum",
-    "6G", "biotech", "biotechnology", "nuclear", "fusion", "cyber", "digital",
-    "chip", "data center", "cloud", "software", "manufacturing", "computing",
-    "telecom", "telecommunications", "robotics", "space",
+    "technology", "AI", "artificial intelligence", "semiconductor", "digital",
+    "manufacturing", "chip", "data center", "cloud", "software", "computing",
+    "nuclear", "quantum", "cyber", "space", "telecom", "telecommunications",
+    "biotech", "biotechnology", "robotics", "6G", "fusion",
 ]
 
 DEAL_KEYWORDS = [
-    "prosperity", "trade deal", "partnership", "agreement", "investment",
-    "bilateral", "memorandum", "MOU", "commitment", "contract", "deal",
-    "cooperation", "framework", "pact", "accord",
+    "deal", "agreement", "partnership", "investment", "cooperation",
+    "prosperity", "trade deal", "bilateral", "commitment", "framework",
+    "memorandum", "MOU", "contract", "pact", "accord",
 ]
 
 # === Data Sources ===
@@ -102,10 +114,15 @@ SOURCES: dict[str, dict] = {
 DEFAULT_MODEL = "claude-3-5-haiku-20241022"
 PREMIUM_MODEL = "claude-opus-4-5-20250220"
 MAX_INPUT_TOKENS = 800
+CLASSIFY_MAX_WORKERS = 8  # Concurrent API calls — each is a network round-trip
 
-PREFILTER_KEYWORDS = TECH_KEYWORDS + DEAL_KEYWORDS
+PREFILTER_KEYWORDS = DEAL_KEYWORDS + TECH_KEYWORDS  # deal terms hit most often
+# Lowercased once at import — matching is always case-insensitive
+PREFILTER_KEYWORDS_LOWER = tuple(kw.lower() for kw in PREFILTER_KEYWORDS)
 
 # === Cost Optimization Defaults ===
 PREFILTER_ENABLED = True
 TRUNCATION_ENABLED = True
 BATCH_MODE = False
+BATCH_POLL_SECONDS = 30  # Batches usually finish within minutes, up to 24h
+BATCH_MAX_WAIT_SECONDS = 2 * 60 * 60  # Give up polling and classify directly after this
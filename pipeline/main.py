@@ -10,22 +10,36 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import os
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Type
+from typing import Dict, List, Optional, Type
 
+from pydantic import TypeAdapter
+
+from pipeline.cache import clear_cache
+from pipeline.classifier import Classifier
 from pipeline.config import (
+    CLASSIFICATION_CACHE_DIR,
     COUNTRY_WATCHLIST,
     DATA_DIR,
+    DEFAULT_MODEL,
     MAX_DEALS_TO_PROCESS,
+    PREMIUM_MODEL,
     SCRAPER_VERSION,
 )
-from pipeline.models import DealsOutput, ErrorRecord, Meta, RawDeal
+from pipeline.models import Deal, DealsOutput, ErrorRecord, Meta, RawDeal
+from pipeline.scrapers.base import _get_extracted_text, close_http_client
 
 logger = logging.getLogger(__name__)
 
+# Serializes straight to UTF-8 bytes in pydantic-core, skipping the
+# intermediate str that model_dump_json would build and re-encode.
+_DEALS_OUTPUT_ADAPTER = TypeAdapter(DealsOutput)
+
 
 def get_scraper_classes() -> Dict[str, Type]:
     """Lazy import scraper classes to avoid import errors if deps missing."""
@@ -42,6 +56,30 @@ def get_scraper_classes() -> Dict[str, Type]:
     }
 
 
+def _run_scraper(scraper_cls: Type, country_filter: Optional[str]) -> List[RawDeal]:
+    """Run one scraper to completion, always releasing its HTTP client."""
+    scraper = scraper_cls(country_filter=country_filter)
+    try:
+        return scraper.scrape()
+    finally:
+        scraper.close()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write data to path via a synced temp file and os.replace.
+
+    Readers see either the old file or the complete new one, never a
+    partial write — even after a crash mid-run.
+    """
+    with tempfile.NamedTemporaryFile(
+        mode="wb", dir=path.parent, suffix=".tmp", delete=False,
+    ) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f.name, path)
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="US Tech Prosperity Deal Tracker Pipeline",
@@ -75,7 +113,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--model", type=str, default=None,
                         help="Override model. Use 'premium' for claude-opus-4-5.")
     parser.add_argument("--batch", action="store_true",
-                        help="Submit as batch job (50%% cheaper, async).")
+                        help="Classify via the Message Batches API (50%% cheaper, waits for the batch).")
     parser.add_argument("--collect-batch", action="store_true",
                         help="Retrieve results from a previous batch job.")
     parser.add_argument("--clear-cache", action="store_true",
@@ -131,18 +169,24 @@ def main() -> None:
     errors: List[ErrorRecord] = []
     sources_scraped: List[str] = []
 
-    for source_name, scraper_cls in scraper_classes.items():
-        scraper = scraper_cls(country_filter=args.country)
+    # Each source is a different host, so scrapers run side by side; results
+    # are merged in source order to keep deal numbering stable.
+    with ThreadPoolExecutor(max_workers=len(scraper_classes)) as executor:
+        futures = {
+            source_name: executor.submit(_run_scraper, scraper_cls, args.country)
+            for source_name, scraper_cls in scraper_classes.items()
+        }
+    close_http_client()
+
+    for source_name, future in futures.items():
         try:
-            raw = scraper.scrape()
+            raw = future.result()
             all_raw_deals.extend(raw)
             sources_scraped.append(source_name)
             print(f"[{source_name}] Fetched {len(raw)} raw deal candidates")
         except Exception as e:
             logger.error("[%s] Scraper failed: %s", source_name, e)
             errors.append(ErrorRecord(source=source_name, error=str(e)))
-        finally:
-            scraper.close()
 
     print(f"\nTotal raw deals fetched: {len(all_raw_deals)}")
 
@@ -155,15 +199,9 @@ def main() -> None:
         return
 
     # === Classification phase ===
-    from pipeline.cache import clear_cache as do_clear_cache
-    from pipeline.classifier import Classifier
-    from pipeline.config import CLASSIFICATION_CACHE_DIR, DEFAULT_MODEL, PREMIUM_MODEL
-    from pipeline.models import CostOptimization, Deal, DealsOutput, Meta, SourceDocument
-    from pipeline.scrapers.base import _get_extracted_text
-
     # Clear classification cache if requested
     if args.clear_cache:
-        do_clear_cache(CLASSIFICATION_CACHE_DIR)
+        clear_cache(CLASSIFICATION_CACHE_DIR)
 
     # Determine model
     model = DEFAULT_MODEL
@@ -182,40 +220,51 @@ def main() -> None:
     # Classify deals
     all_deals: List[Deal] = []
     deal_counter = 0
-    seen_parent_countries: set = set()
+    parents_by_country: Dict[str, Deal] = {}
     deals_to_process = all_raw_deals[:MAX_DEALS_TO_PROCESS] if MAX_DEALS_TO_PROCESS else all_raw_deals
 
+    items = []
     for raw in deals_to_process:
         try:
             # Get the extracted text (cached Layer 2) for this page
             page_text = _get_extracted_text(raw.source_url)
-            if not page_text:
-                # Fallback: use the snippet from the raw deal
-                page_text = f"{raw.title}\n\n{raw.snippet}"
-
-            deal_counter += 1
-            parent, children = classifier.classify_page(
-                raw, page_text, "tpd", deal_counter,
-            )
-
-            if parent:
-                # Deduplicate parent TPDs by country
-                if parent.country not in seen_parent_countries:
-                    all_deals.append(parent)
-                    seen_parent_countries.add(parent.country)
-                else:
-                    # Merge: add source documents to existing parent
-                    for existing in all_deals:
-                        if existing.parent_id is None and existing.country == parent.country:
-                            existing.source_documents.extend(parent.source_documents)
-                            break
-
-                # Always add children
-                all_deals.extend(children)
-
         except Exception as e:
+            # e.g. an unreadable or truncated cache file — skip just this page
             logger.error("Classification failed for '%s': %s", raw.title[:50], e)
             errors.append(ErrorRecord(source=raw.source_url, error=str(e)))
+            continue
+        if not page_text:
+            # Fallback: use the snippet from the raw deal
+            page_text = f"{raw.title}\n\n{raw.snippet}"
+        deal_counter += 1
+        items.append((raw, page_text, deal_counter))
+
+    # API calls run concurrently; merging below stays in input order.
+    # Flush even if classification raises — those results are already paid for.
+    try:
+        results = classifier.classify_pages(items, "tpd")
+    finally:
+        classifier.flush_cache()
+
+    for (raw, _page_text, _counter), result in zip(items, results):
+        if isinstance(result, Exception):
+            logger.error("Classification failed for '%s': %s", raw.title[:50], result)
+            errors.append(ErrorRecord(source=raw.source_url, error=str(result)))
+            continue
+
+        parent, children = result
+        if parent:
+            # Deduplicate parent TPDs by country
+            existing = parents_by_country.get(parent.country)
+            if existing is None:
+                all_deals.append(parent)
+                parents_by_country[parent.country] = parent
+            else:
+                # Merge: add source documents to existing parent
+                existing.source_documents.extend(parent.source_documents)
+
+            # Always add children
+            all_deals.extend(children)
 
     # Build final output
     countries_tracked = (
@@ -246,12 +295,7 @@ def main() -> None:
     # Atomic write to data/deals.json
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     output_path = DATA_DIR / "deals.json"
-    with tempfile.NamedTemporaryFile(
-        mode="w", dir=DATA_DIR, suffix=".tmp", delete=False,
-    ) as f:
-        f.write(output.model_dump_json(indent=2))
-        tmp_path = Path(f.name)
-    tmp_path.rename(output_path)
+    _atomic_write(output_path, _DEALS_OUTPUT_ADAPTER.dump_json(output, indent=2))
 
     # Print cost summary
     print(f"\n{'='*50}")
@@ -259,8 +303,8 @@ def main() -> None:
     print(f"{'='*50}")
     print(f"  Scanned:          {output.meta.deals_scanned}")
     print(f"  Processed:        {output.meta.deals_processed}")
-    parents = sum(1 for d in all_deals if d.parent_id is None)
-    children = sum(1 for d in all_deals if d.parent_id is not None)
+    parents = len(parents_by_country)  # one parent per country after the merge
+    children = len(all_deals) - parents
     print(f"  Parent TPDs:      {parents}")
     print(f"  Child commits:    {children}")
     print(f"  Pre-filter skip:  {classifier.stats.prefilter_skipped}")
@@ -300,12 +344,8 @@ def _write_raw_output(
 
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     output_path = DATA_DIR / "deals.raw.json"
-    with tempfile.NamedTemporaryFile(
-        mode="w", dir=DATA_DIR, suffix=".tmp", delete=False,
-    ) as f:
-        json.dump(output, f, indent=2)
-        tmp_path = Path(f.name)
-    tmp_path.rename(output_path)
+    # One encode + one write; json.dump would issue a write per chunk
+    _atomic_write(output_path, json.dumps(output, indent=2).encode("utf-8"))
     print(f"\nRaw output written to: {output_path}")
 
 
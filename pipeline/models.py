@@ -8,7 +8,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class DealType(str, Enum):
@@ -28,12 +28,16 @@ class DealStatus(str, Enum):
 
 class SourceDocument(BaseModel):
     """A reference to an original source document (fact sheet, announcement, etc.)."""
+    model_config = ConfigDict(frozen=True)
+
     label: str
     url: str
 
 
 class RawDeal(BaseModel):
-    """Unclassified deal candidate from a scraper."""
+    """Unclassified deal candidate from a scraper. Immutable and hashable."""
+    model_config = ConfigDict(frozen=True)
+
     title: str
     source_url: str
     source_id: str = ""
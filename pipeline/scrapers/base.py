@@ -13,26 +13,47 @@ ZERO HTML parsing, and ZERO API calls.
 from __future__ import annotations
 
 import abc
+import hashlib
+import importlib.util
 import logging
 import re
+import threading
 import time
-from typing import List, Optional
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
 from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
-
-from pipeline.cache import get_cached_page, save_cached_page
+from lxml import etree
+from lxml import html as lxml_html
+
+from pipeline.cache import (
+    FileMemo,
+    cache_path,
+    get_cached_page_bytes,
+    get_cached_page_by_key,
+    legacy_request_source,
+    request_key,
+    save_cached_page_by_key,
+    url_hash,
+    write_cache_file,
+)
 from pipeline.config import (
     BACKOFF_START_SECONDS,
     CACHE_DIR,
     COUNTRY_WATCHLIST,
-    DEAL_KEYWORDS,
+    FETCH_MAX_WORKERS,
+    HTTP_CONNECT_RETRIES,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
     MAX_RETRIES,
     PAGE_CACHE_DIR,
+    PREFILTER_KEYWORDS_LOWER,
     REQUEST_DELAY_SECONDS,
     REQUEST_TIMEOUT_SECONDS,
-    TECH_KEYWORDS,
     USER_AGENT,
 )
 from pipeline.models import RawDeal
@@ -43,63 +64,197 @@ logger = logging.getLogger(__name__)
 EXTRACTED_CACHE_DIR = CACHE_DIR / "extracted"
 
 
+# Extracted text is stored zlib-compressed in the sharded BLAKE2b layout.
+# Caches from before that change hold plain .txt files in one flat
+# directory, named by truncated SHA-256; those are still read, so old
+# caches don't force a refetch until the page is next re-extracted.
+_EXTRACTED_SUFFIX = ".txt.z"
+_EXTRACTED_ZLIB_LEVEL = 3
+
+
+def _legacy_extracted_path(url: str) -> Path:
+    return EXTRACTED_CACHE_DIR / f"{hashlib.sha256(url.encode()).hexdigest()[:16]}.txt"
+
+
 def _get_extracted_text(url: str) -> Optional[str]:
     """Retrieve cached extracted text for a URL."""
-    from pipeline.cache import url_hash
-    cache_file = EXTRACTED_CACHE_DIR / f"{url_hash(url)}.txt"
-    if cache_file.exists():
-        logger.debug("Cache HIT (extracted): %s", url)
-        return cache_file.read_text(encoding="utf-8")
-    return None
+    key = url_hash(url)
+    try:
+        text = _load_extracted_text(cache_path(EXTRACTED_CACHE_DIR, key, _EXTRACTED_SUFFIX))
+    except FileNotFoundError:
+        try:
+            text = _load_extracted_text(_legacy_extracted_path(url))
+        except FileNotFoundError:
+            return None
+    logger.debug("Cache HIT (extracted): %s", url)
+    return text
+
+
+def _read_extracted_text(cache_file: Path) -> str:
+    data = cache_file.read_bytes()
+    if cache_file.suffix == ".z":
+        data = zlib.decompress(data)
+    return data.decode("utf-8")
+
+
+_load_extracted_text: FileMemo[str] = FileMemo(_read_extracted_text, maxsize=4096)
 
 
 def _save_extracted_text(url: str, text: str) -> None:
     """Save extracted text to cache."""
-    from pipeline.cache import url_hash
-    EXTRACTED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    cache_file = EXTRACTED_CACHE_DIR / f"{url_hash(url)}.txt"
-    cache_file.write_text(text, encoding="utf-8")
+    cache_file = cache_path(EXTRACTED_CACHE_DIR, url_hash(url), _EXTRACTED_SUFFIX)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    write_cache_file(cache_file, zlib.compress(text.encode("utf-8"), _EXTRACTED_ZLIB_LEVEL))
+    _load_extracted_text.discard(cache_file)
     logger.debug("Cached extracted text: %s -> %s", url, cache_file.name)
 
 
-def extract_text_from_html(html: str) -> str:
+# Listing-page anchors with shorter text are nav/category links, not articles
+MIN_LINK_TITLE_LEN = 10
+
+
+def links_containing(segments: Iterable[str]) -> etree.XPath:
+    """Compile an XPath selecting <a> tags whose href contains any segment.
+
+    The href test runs inside lxml, so a listing parser only ever sees
+    candidate links — nav/footer anchors are never handed back to Python.
+    """
+    test = " or ".join(f'contains(@href, "{seg}")' for seg in segments)
+    return etree.XPath(f"//a[{test}]")
+
+
+# Non-content elements dropped before text extraction
+_JUNK_TAGS = frozenset({"script", "style", "nav", "header", "footer",
+                        "aside", "iframe", "noscript", "form"})
+_UTF8_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+# Main-content fallbacks, compiled once rather than per page
+_CONTENT_CLASS_RE = re.compile(r"content|entry|post|article", re.I)
+_CONTENT_ID_RE = re.compile(r"content|entry|post|article", re.I)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def parse_html(html: Union[str, bytes]) -> Optional[lxml_html.HtmlElement]:
+    """Parse an HTML document with lxml. Returns None for an empty document.
+
+    Bytes input must be UTF-8 (as stored in the Layer 1 cache); str input
+    is encoded first, so a page's own <meta charset> is never trusted.
+    """
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    try:
+        return lxml_html.document_fromstring(html, parser=_UTF8_HTML_PARSER)
+    except etree.ParserError:
+        return None
+
+
+def node_text(node: lxml_html.HtmlElement, separator: str = "") -> str:
+    """Join a node's stripped, non-empty text pieces, like get_text(strip=True)."""
+    return separator.join(t for t in (s.strip() for s in node.itertext()) if t)
+
+
+def _find_main(doc: lxml_html.HtmlElement) -> lxml_html.HtmlElement:
+    """Pick the main content area in a single walk of the tree.
+
+    Candidates in priority order: first <article>, first <main>, first div
+    whose class then id looks like content, <body>, the whole document.
+    Junk subtrees are skipped, so nothing inside them can be chosen.
+    """
+    found = {}  # priority -> first element seen
+    walker = etree.iterwalk(doc, events=("start",), tag=etree.Element)
+    for _event, el in walker:
+        tag = el.tag
+        if tag in _JUNK_TAGS:
+            walker.skip_subtree()
+        elif tag == "article":
+            found.setdefault(0, el)
+            break  # nothing outranks the first <article>
+        elif tag == "main":
+            found.setdefault(1, el)
+        elif tag == "div":
+            if 2 not in found and _CONTENT_CLASS_RE.search(el.get("class", "")):
+                found[2] = el
+            if 3 not in found and _CONTENT_ID_RE.search(el.get("id", "")):
+                found[3] = el
+        elif tag == "body":
+            found.setdefault(4, el)
+    return found[min(found)] if found else doc
+
+
+def _content_text(main: lxml_html.HtmlElement, separator: str) -> str:
+    """Join stripped text pieces under main, skipping junk subtrees.
+
+    The tree is never modified: a junk element's own content is skipped
+    but the text that follows it is kept as a separate piece.
+    """
+    pieces = []
+    walker = etree.iterwalk(main, events=("start", "end", "comment", "pi"))
+    for event, el in walker:
+        if event == "start":
+            if el.tag in _JUNK_TAGS:
+                walker.skip_subtree()
+                continue
+            text = el.text
+        elif el is main:
+            continue
+        else:
+            # "end", or a comment / PI: only the text after it is visible
+            text = el.tail
+        if text:
+            text = text.strip()
+            if text:
+                pieces.append(text)
+    return separator.join(pieces)
+
+
+def extract_text_from_html(html: Union[str, bytes]) -> str:
     """Extract clean article text from HTML, stripping nav/scripts/footers.
 
     This is cached (Layer 2) so we only parse each page once.
     The output is what gets sent to the AI classifier — keeping it
-    clean and minimal saves tokens.
+    clean and minimal saves tokens. Parses with lxml directly — no
+    BeautifulSoup object layer.
     """
-    soup = BeautifulSoup(html, "lxml")
-
-    # Remove non-content elements
-    for tag in soup.find_all(["script", "style", "nav", "header", "footer",
-                              "aside", "iframe", "noscript", "form"]):
-        tag.decompose()
-
-    # Try to find the main content area
-    main = (
-        soup.find("article")
-        or soup.find("main")
-        or soup.find("div", class_=re.compile(r"content|entry|post|article", re.I))
-        or soup.find("div", id=re.compile(r"content|entry|post|article", re.I))
-        or soup.body
-    )
-    if main is None:
-        main = soup
-
-    # Get text, collapse whitespace
-    text = main.get_text(separator="\n", strip=True)
+    doc = parse_html(html)
+    if doc is None:
+        return ""
+
+    # Find the main content area, then get its text minus junk elements
+    main = _find_main(doc)
+    text = _content_text(main, separator="\n")
     # Collapse multiple blank lines
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
     return text.strip()
 
 
+def _alternation(terms: Iterable[str]) -> re.Pattern:
+    """Compile lowercase literal terms into one substring alternation."""
+    return re.compile("|".join(re.escape(t.lower()) for t in terms))
+
+
+# Title filter patterns, built once so each title is scanned in a single
+# regex pass per stage instead of a Python loop over every name/keyword.
+_COUNTRY_RES = {
+    key: _alternation(info["names"]) for key, info in COUNTRY_WATCHLIST.items()
+}
+_ANY_COUNTRY_RE = _alternation(
+    name for info in COUNTRY_WATCHLIST.values() for name in info["names"]
+)
+# Broader TPD-related phrases that also qualify alongside a country name
+_TPD_PHRASES = (
+    "billion", "deal", "state visit", "summit", "cooperation",
+    "joint statement", "fact sheet", "executive order",
+)
+_TITLE_KEYWORD_RE = _alternation(PREFILTER_KEYWORDS_LOWER + _TPD_PHRASES)
+
+
+@lru_cache(maxsize=8192)
 def title_matches_watchlist(title: str, country_filter: Optional[str] = None) -> bool:
     """Check if a page title matches country watchlist + tech/deal keywords.
 
     This is the cheapest possible filter — pure string matching,
     no AI, no network. Runs on listing page titles to decide which
-    pages are worth fetching.
+    pages are worth fetching. Results are memoized — the same teaser
+    titles recur across paginated listing pages.
 
     Match rules:
     1. Country name + any tech/deal keyword → match
@@ -113,38 +268,55 @@ def title_matches_watchlist(title: str, country_filter: Optional[str] = None) ->
         return True
 
     # Check country match
-    countries_to_check = COUNTRY_WATCHLIST
-    if country_filter and country_filter in COUNTRY_WATCHLIST:
-        countries_to_check = {country_filter: COUNTRY_WATCHLIST[country_filter]}
-
-    country_match = False
-    for _key, info in countries_to_check.items():
-        for name in info["names"]:
-            if name.lower() in title_lower:
-                country_match = True
-                break
-        if country_match:
-            break
-
-    if not country_match:
+    country_re = _COUNTRY_RES.get(country_filter, _ANY_COUNTRY_RE)
+    if country_re.search(title_lower) is None:
         return False
 
-    # Country found — check for tech OR deal keyword
-    all_keywords = TECH_KEYWORDS + DEAL_KEYWORDS
-    for kw in all_keywords:
-        if kw.lower() in title_lower:
-            return True
+    # Country found — check for tech/deal keyword or broader TPD phrase
+    return _TITLE_KEYWORD_RE.search(title_lower) is not None
+
 
-    # Also match country + broader TPD-related phrases
-    tpd_phrases = [
-        "billion", "deal", "state visit", "summit", "cooperation",
-        "joint statement", "fact sheet", "executive order",
-    ]
-    for phrase in tpd_phrases:
-        if phrase in title_lower:
-            return True
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
-    return False
+
+def get_http_client() -> httpx.Client:
+    """Lazy-initialize one HTTP client per process.
+
+    Shared by every scraper and fetch thread so warm keep-alive connections
+    (and HTTP/2 multiplexing, when h2 is installed) are reused across them.
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            # Failed connects are retried in the transport right away; the
+            # backoff loop in fetch_page is for 429s and server errors.
+            transport = httpx.HTTPTransport(
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                ),
+                retries=HTTP_CONNECT_RETRIES,
+            )
+            _http_client = httpx.Client(
+                headers={"User-Agent": USER_AGENT},
+                timeout=REQUEST_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                transport=transport,
+            )
+        return _http_client
+
+
+def close_http_client() -> None:
+    """Close the shared HTTP client, if one was opened."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
 
 
 class BaseScraper(abc.ABC):
@@ -156,7 +328,9 @@ class BaseScraper(abc.ABC):
 
     def __init__(self, country_filter: Optional[str] = None) -> None:
         self._client: Optional[httpx.Client] = None
-        self._last_request_time: dict[str, float] = {}
+        # Per-host earliest start of the next request, in monotonic ns
+        self._next_request_ns: dict[str, int] = {}
+        self._rate_lock = threading.Lock()
         self.country_filter = country_filter
 
     @property
@@ -165,22 +339,26 @@ class BaseScraper(abc.ABC):
 
     def _get_client(self) -> httpx.Client:
         if self._client is None:
-            self._client = httpx.Client(
-                headers={"User-Agent": USER_AGENT},
-                timeout=REQUEST_TIMEOUT_SECONDS,
-                follow_redirects=True,
-            )
+            self._client = get_http_client()
         return self._client
 
     def _rate_limit(self, host: str) -> None:
-        """Enforce minimum delay between requests to the same host."""
-        last = self._last_request_time.get(host, 0)
-        elapsed = time.time() - last
-        if elapsed < REQUEST_DELAY_SECONDS:
-            sleep_time = REQUEST_DELAY_SECONDS - elapsed
-            logger.debug("Rate limiting: sleeping %.1fs for %s", sleep_time, host)
-            time.sleep(sleep_time)
-        self._last_request_time[host] = time.time()
+        """Enforce minimum delay between requests to the same host.
+
+        Thread-safe: each caller reserves the next free slot under the lock,
+        then sleeps outside it, so concurrent fetches stay spaced out.
+        Uses the monotonic clock, so wall-clock jumps (NTP) can't shorten
+        or stretch the gap.
+        """
+        delay_ns = int(REQUEST_DELAY_SECONDS * 1e9)
+        with self._rate_lock:
+            now = time.monotonic_ns()
+            start = max(now, self._next_request_ns.get(host, 0))
+            self._next_request_ns[host] = start + delay_ns
+        sleep_ns = start - now
+        if sleep_ns > 0:
+            logger.debug("Rate limiting: sleeping %.1fs for %s", sleep_ns / 1e9, host)
+            time.sleep(sleep_ns / 1e9)
 
     def fetch_page(
         self,
@@ -195,16 +373,13 @@ class BaseScraper(abc.ABC):
         to distinguish different searches to the same endpoint.
         """
         # Build cache key (include body for POST requests)
-        cache_key = url
-        if json_body:
-            import json
-            cache_key = url + "|" + json.dumps(json_body, sort_keys=True)
-        if params:
-            import json
-            cache_key = url + "?" + json.dumps(params, sort_keys=True)
+        cache_key = request_key(url, json_body, params)
 
         # Layer 1: check page cache
-        cached = get_cached_page(PAGE_CACHE_DIR, cache_key)
+        cached = get_cached_page_by_key(
+            PAGE_CACHE_DIR, cache_key,
+            legacy_source=legacy_request_source(url, json_body, params),
+        )
         if cached is not None:
             return cached
 
@@ -243,7 +418,7 @@ class BaseScraper(abc.ABC):
                 content = response.text
 
                 # Save to Layer 1 cache
-                save_cached_page(PAGE_CACHE_DIR, cache_key, content)
+                save_cached_page_by_key(PAGE_CACHE_DIR, cache_key, content)
                 return content
 
             except httpx.HTTPError as e:
@@ -267,8 +442,11 @@ class BaseScraper(abc.ABC):
         if cached_text is not None:
             return cached_text
 
-        # Layer 1: fetch raw HTML (cached)
-        html = self.fetch_page(url)
+        # Layer 1: raw HTML. Cached pages go to the parser as bytes,
+        # skipping a full-page decode.
+        html: Optional[Union[str, bytes]] = get_cached_page_bytes(PAGE_CACHE_DIR, url)
+        if html is None:
+            html = self.fetch_page(url)
         if html is None:
             return None
 
@@ -277,12 +455,26 @@ class BaseScraper(abc.ABC):
         _save_extracted_text(url, text)
         return text
 
+    def fetch_and_extract_many(self, urls: List[str]) -> List[Optional[str]]:
+        """fetch_and_extract() over many URLs concurrently, in input order.
+
+        Cached pages return immediately; uncached fetches overlap their
+        network waits while _rate_limit keeps per-host spacing.
+        """
+        return self._map_concurrently(self.fetch_and_extract, urls)
+
+    def _map_concurrently(self, fn, urls: List[str]) -> list:
+        if len(urls) <= 1:
+            return [fn(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=min(FETCH_MAX_WORKERS, len(urls))) as executor:
+            return list(executor.map(fn, urls))
+
     @abc.abstractmethod
     def scrape(self) -> List[RawDeal]:
         """Return raw deal candidates. Subclasses implement this."""
         ...
 
     def close(self) -> None:
-        if self._client:
-            self._client.close()
-            self._client = None
+        # Drops this scraper's reference only; the shared client is closed
+        # once by close_http_client() when the fetch phase is over.
+        self._client = None
@@ -9,14 +9,18 @@ Same caching strategy as whitehouse.py:
 from __future__ import annotations
 
 import logging
-import re
-from typing import List, Tuple
-
-from bs4 import BeautifulSoup
+from typing import List, Set, Tuple
 
 from pipeline.config import SOURCES
 from pipeline.models import RawDeal
-from pipeline.scrapers.base import BaseScraper, title_matches_watchlist
+from pipeline.scrapers.base import (
+    MIN_LINK_TITLE_LEN,
+    BaseScraper,
+    links_containing,
+    node_text,
+    parse_html,
+    title_matches_watchlist,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,9 @@ logger = logging.getLogger(__name__)
 class CommerceScraper(BaseScraper):
     """Scrape commerce.gov fact sheets and press releases for TPD content."""
 
+    _WANTED_SEGMENTS = ("/news/", "/fact-sheets/", "/press-releases/")
+    _LINKS_XPATH = links_containing(_WANTED_SEGMENTS)
+
     @property
     def name(self) -> str:
         return "Commerce"
@@ -53,7 +60,7 @@ class CommerceScraper(BaseScraper):
     ) -> List[RawDeal]:
         """Paginate through commerce.gov listing and find matching articles."""
         results: List[RawDeal] = []
-        seen_urls: set = set()
+        seen_urls: Set[str] = set()
 
         for page_num in range(0, max_pages):  # commerce.gov uses 0-indexed pages
             url = url_template.format(page=page_num)
@@ -69,7 +76,7 @@ class CommerceScraper(BaseScraper):
                 )
                 break
 
-            matched = 0
+            matches: List[Tuple[str, str]] = []
             for title, link in candidates:
                 if link in seen_urls:
                     continue
@@ -77,13 +84,17 @@ class CommerceScraper(BaseScraper):
 
                 if not title_matches_watchlist(title, self.country_filter):
                     continue
+                matches.append((title, link))
 
-                matched += 1
-                text = self.fetch_and_extract(link)
+            # Fetch matched articles concurrently (rate limit still applies)
+            texts = self.fetch_and_extract_many([link for _, link in matches])
+            matched = len(matches)
+            for (title, link), text in zip(matches, texts):
                 snippet = text[:1000] if text else ""
                 raw_date = self._extract_date_from_url(link)
 
-                results.append(RawDeal(
+                # All fields are str built right here — skip pydantic validation
+                results.append(RawDeal.model_construct(
                     title=title,
                     source_url=link,
                     source_id="",
@@ -101,24 +112,20 @@ class CommerceScraper(BaseScraper):
 
     def _parse_listing_page(self, html: str) -> List[Tuple[str, str]]:
         """Extract (title, url) pairs from a Commerce.gov listing page."""
-        soup = BeautifulSoup(html, "lxml")
         results: List[Tuple[str, str]] = []
-
-        # Commerce.gov news listings typically use article/teaser patterns
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            title = a_tag.get_text(strip=True)
-
-            if not title or len(title) < 10:
-                continue
-
-            # Only follow links to commerce.gov news content
-            if not any(
-                segment in href
-                for segment in ["/news/", "/fact-sheets/", "/press-releases/"]
-            ):
+        doc = parse_html(html)
+        if doc is None:
+            return results
+
+        # Commerce.gov news listings typically use article/teaser patterns.
+        # Only links to news content survive the XPath (evaluated in C), so
+        # the title text is only built for those.
+        for a_tag in self._LINKS_XPATH(doc):
+            title = node_text(a_tag)
+            if len(title) < MIN_LINK_TITLE_LEN:
                 continue
 
+            href = a_tag.get("href")
             if href.startswith("/"):
                 href = "https://www.commerce.gov" + href
 
@@ -128,7 +135,15 @@ class CommerceScraper(BaseScraper):
 
     def _extract_date_from_url(self, url: str) -> str:
         """Try to extract date from URL like /2026/02/fact-sheet-..."""
-        match = re.search(r"/(\d{4})/(\d{2})/", url)
-        if match:
-            return f"{match.group(1)}-{match.group(2)}-01"
+        # Plain string scan for the leftmost "/YYYY/MM/" — no regex engine
+        i = url.find("/")
+        while i != -1 and i + 8 < len(url):
+            year, month = url[i + 1:i + 5], url[i + 6:i + 8]
+            if (
+                url[i + 5] == "/" and url[i + 8] == "/"
+                and year.isascii() and year.isdigit()
+                and month.isascii() and month.isdigit()
+            ):
+                return f"{year}-{month}-01"
+            i = url.find("/", i + 1)
         return ""
@@ -11,18 +11,48 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import List
-from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from urllib.parse import urlencode
 
-from pipeline.config import COUNTRY_WATCHLIST, SOURCES
+from pipeline.config import COUNTRY_WATCHLIST, FR_SEARCH_MAX_WORKERS, SOURCES
 from pipeline.models import RawDeal
 from pipeline.scrapers.base import BaseScraper
 
 logger = logging.getLogger(__name__)
 
+# orjson parses API responses several times faster when it is installed;
+# it is optional, so fall back to the stdlib parser (same results).
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _JSON_ERRORS: tuple = (orjson.JSONDecodeError, ValueError)
+except ImportError:
+    _json_loads = json.loads
+    _JSON_ERRORS = (json.JSONDecodeError, ValueError)
+
 # Fields we request — only what we need, reduces response size
 _FIELDS = ["title", "abstract", "document_number", "publication_date", "html_url", "type"]
-_FIELDS_QS = "&".join(f"fields%5B%5D={f}" for f in _FIELDS)
+_FIELDS_QS = urlencode([("fields[]", f) for f in _FIELDS])
+
+# Everything but the term and per_page is fixed, so the query string is
+# encoded once here. Parameter order is kept stable because the URL is
+# the Layer 1 cache key.
+_DATE_QS = urlencode([("conditions[publication_date][gte]", "2025-01-01")])
+_TAIL_QS = urlencode([("page", "1"), ("order", "newest")]) + "&" + _FIELDS_QS
+
+
+# Focused search terms — fewer queries = less API load + more cache reuse.
+# One request per country: the FR full-text search ORs grouped terms with
+# "|", and each group keeps its all-words matching. The joined template is
+# built once; only the country name varies per search.
+_SEARCH_TEMPLATES = (
+    "{name} technology trade",
+    "{name} technology prosperity deal",
+    "{name} bilateral technology agreement",
+)
+_SEARCH_TERM_TEMPLATE = " | ".join(f"({t})" for t in _SEARCH_TEMPLATES)
 
 
 def _build_fr_url(base: str, term: str, per_page: int = 20) -> str:
@@ -32,16 +62,8 @@ def _build_fr_url(base: str, term: str, per_page: int = 20) -> str:
     We skip the agencies filter since it causes 400 errors with
     certain combinations — the term search alone is sufficient.
     """
-    encoded_term = quote_plus(term)
-    return (
-        f"{base}"
-        f"?conditions%5Bterm%5D={encoded_term}"
-        f"&conditions%5Bpublication_date%5D%5Bgte%5D=2025-01-01"
-        f"&per_page={per_page}"
-        f"&page=1"
-        f"&order=newest"
-        f"&{_FIELDS_QS}"
-    )
+    term_qs = urlencode([("conditions[term]", term)])
+    return f"{base}?{term_qs}&{_DATE_QS}&per_page={per_page}&{_TAIL_QS}"
 
 
 class FederalRegisterScraper(BaseScraper):
@@ -59,17 +81,21 @@ class FederalRegisterScraper(BaseScraper):
         if self.country_filter and self.country_filter in COUNTRY_WATCHLIST:
             countries = {self.country_filter: COUNTRY_WATCHLIST[self.country_filter]}
 
-        for country_key, country_info in countries.items():
-            country_deals = self._search_country(
-                country_info["names"],
-                country_info["code"],
-                config,
-            )
-            deals.extend(country_deals)
-            logger.info(
-                "[%s] Found %d candidates for %s",
-                self.name, len(country_deals), country_key,
-            )
+        # Searches are independent; fetch_page's per-domain rate limit still
+        # spaces the live requests, so the pool only overlaps their latency.
+        # map() keeps watchlist order, so the output is deterministic.
+        def search(item) -> List[RawDeal]:
+            _, country_info = item
+            return self._search_country(country_info["names"], country_info["code"], config)
+
+        items = list(countries.items())
+        with ThreadPoolExecutor(max_workers=max(1, min(FR_SEARCH_MAX_WORKERS, len(items)))) as executor:
+            for (country_key, _), country_deals in zip(items, executor.map(search, items)):
+                deals.extend(country_deals)
+                logger.info(
+                    "[%s] Found %d candidates for %s",
+                    self.name, len(country_deals), country_key,
+                )
 
         return deals
 
@@ -84,53 +110,42 @@ class FederalRegisterScraper(BaseScraper):
         primary_name = country_names[0]
         per_page = config.get("per_page", 20)
 
-        # Focused search terms — fewer queries = less API load + more cache reuse
-        search_terms = [
-            f"{primary_name} technology trade",
-            f"{primary_name} technology prosperity deal",
-            f"{primary_name} bilateral technology agreement",
-        ]
-
-        seen_doc_numbers: set = set()
-
-        for term in search_terms:
-            url = _build_fr_url(config["search_endpoint"], term, per_page)
-
-            page_content = self.fetch_page(url)
-            if page_content is None:
-                continue
-
-            try:
-                data = json.loads(page_content)
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.error("[%s] Invalid JSON from API: %s", self.name, e)
-                continue
-
-            docs = data.get("results", [])
-            total = data.get("count", 0)
-            logger.info(
-                "[%s] Search '%s': %d results (showing %d)",
-                self.name, term, total, len(docs),
+        # The page holds as many results as the separate searches did combined
+        term = _SEARCH_TERM_TEMPLATE.format(name=primary_name)
+        url = _build_fr_url(config["search_endpoint"], term, per_page * len(_SEARCH_TEMPLATES))
+
+        page_content = self.fetch_page(url)
+        if page_content is None:
+            return results
+
+        try:
+            data = _json_loads(page_content)
+        except _JSON_ERRORS as e:
+            logger.error("[%s] Invalid JSON from API: %s", self.name, e)
+            return results
+
+        docs = data.get("results", [])
+        total = data.get("count", 0)
+        logger.info(
+            "[%s] Search '%s': %d results (showing %d)",
+            self.name, term, total, len(docs),
+        )
+
+        # Keep the first doc per document number, in response order
+        unique_docs: Dict[str, dict] = {}
+        for doc in docs:
+            unique_docs.setdefault(doc.get("document_number", ""), doc)
+
+        results.extend(
+            RawDeal(
+                title=doc.get("title", ""),
+                source_url=doc.get("html_url", ""),
+                source_id=f"FR-{doc_number}",
+                snippet=(doc.get("abstract") or "")[:1000],  # Cap snippet to save tokens later
+                raw_date=doc.get("publication_date", ""),
+                source_name="federal_register",
             )
-
-            for doc in docs:
-                doc_number = doc.get("document_number", "")
-                if doc_number in seen_doc_numbers:
-                    continue
-                seen_doc_numbers.add(doc_number)
-
-                title = doc.get("title", "")
-                abstract = doc.get("abstract", "") or ""
-                html_url = doc.get("html_url", "")
-                pub_date = doc.get("publication_date", "")
-
-                results.append(RawDeal(
-                    title=title,
-                    source_url=html_url,
-                    source_id=f"FR-{doc_number}",
-                    snippet=abstract[:1000],  # Cap snippet to save tokens later
-                    raw_date=pub_date,
-                    source_name="federal_register",
-                ))
+            for doc_number, doc in unique_docs.items()
+        )
 
         return results
@@ -10,20 +10,37 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import List, Tuple
-
-from bs4 import BeautifulSoup
+from typing import List, Set, Tuple
 
 from pipeline.config import SOURCES
 from pipeline.models import RawDeal
-from pipeline.scrapers.base import BaseScraper, title_matches_watchlist
+from pipeline.scrapers.base import (
+    MIN_LINK_TITLE_LEN,
+    BaseScraper,
+    links_containing,
+    node_text,
+    parse_html,
+    title_matches_watchlist,
+)
 
 logger = logging.getLogger(__name__)
 
+# USTR URLs look like /2025/may/... or /2025/05/...
+_DATE_RE = re.compile(r"/(\d{4})/(\w+)/")
+_MONTH_MAP = {
+    "january": "01", "february": "02", "march": "03", "april": "04",
+    "may": "05", "june": "06", "july": "07", "august": "08",
+    "september": "09", "october": "10", "november": "11", "december": "12",
+}
+
 
 class USTRScraper(BaseScraper):
     """Scrape USTR.gov fact sheets and press releases for trade deal content."""
 
+    _WANTED_SEGMENTS = ("/fact-sheets/", "/press-releases/", "/trade-agreements/",
+                        "/about-us/policy-offices/")
+    _LINKS_XPATH = links_containing(_WANTED_SEGMENTS)
+
     @property
     def name(self) -> str:
         return "USTR"
@@ -53,7 +70,7 @@ class USTRScraper(BaseScraper):
     ) -> List[RawDeal]:
         """Fetch USTR listing pages and find matching articles."""
         results: List[RawDeal] = []
-        seen_urls: set = set()
+        seen_urls: Set[str] = set()
 
         # USTR uses ?page=N for pagination
         for page_num in range(0, max_pages):
@@ -74,7 +91,7 @@ class USTRScraper(BaseScraper):
                 )
                 break
 
-            matched = 0
+            matches: List[Tuple[str, str]] = []
             for title, link in candidates:
                 if link in seen_urls:
                     continue
@@ -82,13 +99,17 @@ class USTRScraper(BaseScraper):
 
                 if not title_matches_watchlist(title, self.country_filter):
                     continue
+                matches.append((title, link))
 
-                matched += 1
-                text = self.fetch_and_extract(link)
+            # Fetch matched articles concurrently (rate limit still applies)
+            texts = self.fetch_and_extract_many([link for _, link in matches])
+            matched = len(matches)
+            for (title, link), text in zip(matches, texts):
                 snippet = text[:1000] if text else ""
                 raw_date = self._extract_date_from_url(link)
 
-                results.append(RawDeal(
+                # All fields are str built right here — skip pydantic validation
+                results.append(RawDeal.model_construct(
                     title=title,
                     source_url=link,
                     source_id="",
@@ -106,24 +127,17 @@ class USTRScraper(BaseScraper):
 
     def _parse_listing_page(self, html: str) -> List[Tuple[str, str]]:
         """Extract (title, url) pairs from a USTR listing page."""
-        soup = BeautifulSoup(html, "lxml")
         results: List[Tuple[str, str]] = []
-
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            title = a_tag.get_text(strip=True)
-
-            if not title or len(title) < 10:
-                continue
-
-            # Follow links to USTR content pages
-            if not any(
-                segment in href
-                for segment in [
-                    "/fact-sheets/", "/press-releases/", "/trade-agreements/",
-                    "/about-us/policy-offices/",
-                ]
-            ):
+        doc = parse_html(html)
+        if doc is None:
+            return results
+
+        # Only links to USTR content pages come back from the XPath, so
+        # nav/footer links never have their text collected
+        for a_tag in self._LINKS_XPATH(doc):
+            href = a_tag.get("href")
+            title = node_text(a_tag)
+            if len(title) < MIN_LINK_TITLE_LEN:
                 continue
 
             if href.startswith("/"):
@@ -135,17 +149,12 @@ class USTRScraper(BaseScraper):
 
     def _extract_date_from_url(self, url: str) -> str:
         """Try to extract date from USTR URL patterns."""
-        match = re.search(r"/(\d{4})/(\w+)/", url)
+        match = _DATE_RE.search(url)
         if match:
             year = match.group(1)
             month_str = match.group(2)
             # USTR sometimes uses month names like "may", "october"
-            month_map = {
-                "january": "01", "february": "02", "march": "03", "april": "04",
-                "may": "05", "june": "06", "july": "07", "august": "08",
-                "september": "09", "october": "10", "november": "11", "december": "12",
-            }
-            month = month_map.get(month_str.lower(), month_str.zfill(2))
+            month = _MONTH_MAP.get(month_str.lower(), month_str.zfill(2))
             if len(month) == 2 and month.isdigit():
                 return f"{year}-{month}-01"
         return ""
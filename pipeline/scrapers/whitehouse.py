@@ -13,20 +13,31 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import List, Optional, Tuple
-
-from bs4 import BeautifulSoup
+from typing import List, Optional, Set, Tuple
 
 from pipeline.config import SOURCES
 from pipeline.models import RawDeal
-from pipeline.scrapers.base import BaseScraper, title_matches_watchlist
+from pipeline.scrapers.base import (
+    MIN_LINK_TITLE_LEN,
+    BaseScraper,
+    links_containing,
+    node_text,
+    parse_html,
+    title_matches_watchlist,
+)
 
 logger = logging.getLogger(__name__)
 
+# Article URLs carry their publication month: /2025/09/some-article/
+_DATE_RE = re.compile(r"/(\d{4})/(\d{2})/")
+
 
 class WhiteHouseScraper(BaseScraper):
     """Scrape whitehouse.gov fact sheets and articles for TPD-related content."""
 
+    _WANTED_SEGMENTS = ("/articles/", "/fact-sheets/", "/presidential-actions/")
+    _LINKS_XPATH = links_containing(_WANTED_SEGMENTS)
+
     @property
     def name(self) -> str:
         return "WhiteHouse"
@@ -57,7 +68,7 @@ class WhiteHouseScraper(BaseScraper):
     ) -> List[RawDeal]:
         """Paginate through a listing page and find matching articles."""
         results: List[RawDeal] = []
-        seen_urls: set = set()
+        seen_urls: Set[str] = set()
 
         for page_num in range(1, max_pages + 1):
             url = url_template.format(page=page_num)
@@ -78,7 +89,7 @@ class WhiteHouseScraper(BaseScraper):
                 )
                 break
 
-            matched = 0
+            matches: List[Tuple[str, str]] = []
             for title, link in candidates:
                 if link in seen_urls:
                     continue
@@ -87,16 +98,20 @@ class WhiteHouseScraper(BaseScraper):
                 # Cheap title-based filter — no network, no AI
                 if not title_matches_watchlist(title, self.country_filter):
                     continue
+                matches.append((title, link))
 
-                matched += 1
-                # Fetch + extract text for matching pages (cached Layers 1+2)
-                text = self.fetch_and_extract(link)
+            # Fetch + extract text for matching pages concurrently
+            # (cached Layers 1+2; rate limit still applies)
+            texts = self.fetch_and_extract_many([link for _, link in matches])
+            matched = len(matches)
+            for (title, link), text in zip(matches, texts):
                 snippet = text[:1000] if text else ""
 
                 # Try to extract date from URL pattern like /2025/09/
                 raw_date = self._extract_date_from_url(link)
 
-                results.append(RawDeal(
+                # All fields are str built right here — skip pydantic validation
+                results.append(RawDeal.model_construct(
                     title=title,
                     source_url=link,
                     source_id="",
@@ -114,25 +129,21 @@ class WhiteHouseScraper(BaseScraper):
 
     def _parse_listing_page(self, html: str) -> List[Tuple[str, str]]:
         """Extract (title, url) pairs from a WH listing page."""
-        soup = BeautifulSoup(html, "lxml")
         results: List[Tuple[str, str]] = []
-
-        # WH listing pages use various patterns — try common ones
-        # Look for article links in the main content area
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            title = a_tag.get_text(strip=True)
-
+        doc = parse_html(html)
+        if doc is None:
+            return results
+
+        # WH listing pages use various patterns — try common ones.
+        # Only links to WH articles/fact-sheets/presidential-actions come back
+        # from the XPath, so nav links never have their text collected
+        for a_tag in self._LINKS_XPATH(doc):
             # Skip empty titles, navigation links, very short text
-            if not title or len(title) < 10:
+            title = node_text(a_tag)
+            if len(title) < MIN_LINK_TITLE_LEN:
                 continue
 
-            # Only follow links to WH articles/fact-sheets/presidential-actions
-            if not any(
-                segment in href
-                for segment in ["/articles/", "/fact-sheets/", "/presidential-actions/"]
-            ):
-                continue
+            href = a_tag.get("href")
 
             # Normalize URL
             if href.startswith("/"):
@@ -144,7 +155,7 @@ class WhiteHouseScraper(BaseScraper):
 
     def _extract_date_from_url(self, url: str) -> str:
         """Try to extract YYYY-MM-DD from URL like /2025/09/some-article/."""
-        match = re.search(r"/(\d{4})/(\d{2})/", url)
+        match = _DATE_RE.search(url)
         if match:
             return f"{match.group(1)}-{match.group(2)}-01"
         return ""
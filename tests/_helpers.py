@@ -0,0 +1,12 @@
+"""Shared test types (conftest.py holds fixtures only)."""
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Set
+
+
+class DealsPartition(NamedTuple):
+    parents: List[dict]
+    children: List[dict]
+    parent_ids: Set[str]
+    parent_country: Dict[str, str]
+    parent_urls: Dict[str, Set[str]]  # source_url plus source_documents URLs
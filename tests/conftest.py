@@ -3,32 +3,77 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import List
 
 import pytest
 
+from pipeline.models import DealsOutput
+from tests._helpers import DealsPartition
+
+# Same optional fast path as the Federal Register scraper: orjson when
+# installed, else the stdlib parser (identical results).
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def deals_json_path() -> Path:
     return DATA_DIR / "deals.json"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_json_path() -> Path:
     return DATA_DIR / "deals.sample.json"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def deals_data(deals_json_path: Path) -> dict:
-    """Load and return parsed deals.json."""
+    """Load and return parsed deals.json (parsed once, shared — don't mutate)."""
     assert deals_json_path.exists(), f"deals.json not found at {deals_json_path}"
-    return json.loads(deals_json_path.read_text())
+    return _json_loads(deals_json_path.read_bytes())
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_data(sample_json_path: Path) -> dict:
-    """Load and return parsed deals.sample.json."""
+    """Load and return parsed deals.sample.json (parsed once, shared — don't mutate)."""
     assert sample_json_path.exists(), f"deals.sample.json not found at {sample_json_path}"
-    return json.loads(sample_json_path.read_text())
+    return _json_loads(sample_json_path.read_bytes())
+
+
+@pytest.fixture(scope="session")
+def deals_output(deals_json_path: Path) -> DealsOutput:
+    """deals.json validated against the Pydantic schema, once per session."""
+    # pydantic-core parses the bytes itself — no intermediate dict
+    return DealsOutput.model_validate_json(deals_json_path.read_bytes())
+
+
+@pytest.fixture(scope="session")
+def sample_output(sample_json_path: Path) -> DealsOutput:
+    """deals.sample.json validated against the Pydantic schema, once per session."""
+    return DealsOutput.model_validate_json(sample_json_path.read_bytes())
+
+
+@pytest.fixture(scope="session")
+def deals_partition(deals_data: dict) -> DealsPartition:
+    """Parents and children of deals.json, split in one pass (don't mutate)."""
+    parents: List[dict] = []
+    children: List[dict] = []
+    for deal in deals_data["items"]:
+        (parents if deal.get("parent_id") is None else children).append(deal)
+    return DealsPartition(
+        parents=parents,
+        children=children,
+        parent_ids={p["id"] for p in parents},
+        parent_country={p["id"]: p["country"] for p in parents},
+        parent_urls={
+            p["id"]: {p["source_url"], *(doc["url"] for doc in p.get("source_documents", []))}
+            for p in parents
+        },
+    )
@@ -5,19 +5,32 @@ Run with: PYTHONPATH=. python3 -m pytest tests/test_cache.py -v
 """
 from __future__ import annotations
 
+import hashlib
 import json
 from pathlib import Path
 
 import pytest
 
 from pipeline.cache import (
+    ClassificationCacheWriter,
+    FileMemo,
+    cache_path,
     clear_cache,
     content_hash,
     get_cached_classification,
+    get_cached_classification_by_key,
     get_cached_page,
+    get_cached_page_by_key,
+    get_cached_page_bytes,
+    legacy_key,
+    legacy_request_source,
+    request_key,
     save_cached_classification,
+    save_cached_classification_by_key,
     save_cached_page,
+    save_cached_page_by_key,
     url_hash,
+    write_cache_file,
 )
 
 
@@ -41,6 +54,38 @@ class TestUrlHash:
         assert isinstance(h, str)
         assert len(h) == 16
 
+    def test_is_64_bit_blake2b(self) -> None:
+        # Pins the key format — changing the algorithm orphans every cached page
+        expected = hashlib.blake2b(b"https://example.com", digest_size=8).hexdigest()
+        assert url_hash("https://example.com") == expected
+
+
+class TestRequestKey:
+    """Test incremental request hashing for page cache keys."""
+
+    def test_plain_get_matches_url_hash(self) -> None:
+        assert request_key("https://example.com") == url_hash("https://example.com")
+
+    def test_matches_legacy_concatenated_keys(self) -> None:
+        url = "https://api.example.com/search"
+        body = {"q": "japan", "page": 2}
+        assert request_key(url, json_body=body) == url_hash(url + "|" + json.dumps(body, sort_keys=True))
+        assert request_key(url, params=body) == url_hash(url + "?" + json.dumps(body, sort_keys=True))
+
+    def test_key_order_insensitive(self) -> None:
+        url = "https://api.example.com/search"
+        assert request_key(url, params={"a": 1, "b": 2}) == request_key(url, params={"b": 2, "a": 1})
+
+    def test_params_take_precedence_over_body(self) -> None:
+        url = "https://api.example.com/search"
+        assert request_key(url, json_body={"x": 1}, params={"y": 2}) == request_key(url, params={"y": 2})
+
+    def test_legacy_source_mirrors_key_choice(self) -> None:
+        url = "https://api.example.com/search"
+        assert legacy_request_source(url) == url
+        assert legacy_request_source(url, json_body={"q": 1}) == url + '|{"q": 1}'
+        assert legacy_request_source(url, json_body={"x": 1}, params={"y": 2}) == url + '?{"y": 2}'
+
 
 class TestContentHash:
     """Test content hashing for classification cache keys."""
@@ -60,6 +105,25 @@ class TestContentHash:
     def test_sensitive_to_whitespace(self) -> None:
         assert content_hash("hello") != content_hash("hello ")
 
+    def test_is_64_bit_blake2b(self) -> None:
+        expected = hashlib.blake2b("some text".encode(), digest_size=8).hexdigest()
+        assert content_hash("some text") == expected
+
+
+class TestWriteCacheFile:
+    """Test the raw-fd cache file writer."""
+
+    def test_writes_large_payload(self, tmp_path: Path) -> None:
+        data = b"x" * (4 * 1024 * 1024)
+        write_cache_file(tmp_path / "big.bin", data)
+        assert (tmp_path / "big.bin").read_bytes() == data
+
+    def test_truncates_existing(self, tmp_path: Path) -> None:
+        path = tmp_path / "f.txt"
+        write_cache_file(path, b"longer content")
+        write_cache_file(path, b"short")
+        assert path.read_bytes() == b"short"
+
 
 class TestPageCache:
     """Test page cache read/write."""
@@ -84,12 +148,115 @@ class TestPageCache:
         save_cached_page(cache_dir, "https://example.com", "content")
         assert cache_dir.exists()
 
+    def test_bytes_roundtrip(self, tmp_path: Path) -> None:
+        url = "https://example.com/page"
+        save_cached_page(tmp_path, url, "<p>Café</p>")
+        assert get_cached_page_bytes(tmp_path, url) == "<p>Café</p>".encode("utf-8")
+        assert get_cached_page_bytes(tmp_path, "https://other.com") is None
+
+    def test_sharded_by_key_prefix(self, tmp_path: Path) -> None:
+        url = "https://example.com/page"
+        cache_file = save_cached_page(tmp_path, url, "content")
+        h = url_hash(url)
+        assert cache_file == tmp_path / h[:2] / f"{h}.html"
+
+    def test_by_key_roundtrip(self, tmp_path: Path) -> None:
+        key = request_key("https://api.example.com", params={"page": 1})
+        save_cached_page_by_key(tmp_path, key, "results")
+        assert get_cached_page_by_key(tmp_path, key) == "results"
+        assert get_cached_page(tmp_path, "https://api.example.com") is None
+
+    def test_repeat_reads_served_from_memory(self, tmp_path: Path) -> None:
+        url = "https://example.com/page"
+        cache_file = save_cached_page(tmp_path, url, "content")
+        assert get_cached_page(tmp_path, url) == "content"
+        cache_file.unlink()  # a memoized hit no longer touches disk
+        assert get_cached_page_bytes(tmp_path, url) == b"content"
+
+    def test_clear_cache_drops_memoized_pages(self, tmp_path: Path) -> None:
+        url = "https://example.com/page"
+        save_cached_page(tmp_path, url, "content")
+        assert get_cached_page(tmp_path, url) == "content"
+        clear_cache(tmp_path)
+        assert get_cached_page(tmp_path, url) is None
+
     def test_overwrites_existing(self, tmp_path: Path) -> None:
         url = "https://example.com"
         save_cached_page(tmp_path, url, "old")
         save_cached_page(tmp_path, url, "new")
         assert get_cached_page(tmp_path, url) == "new"
 
+    def test_reads_and_migrates_legacy_entry(self, tmp_path: Path) -> None:
+        # Written by the old cache: flat <sha256[:16]>.html
+        url = "https://example.com/legacy"
+        legacy = tmp_path / f"{hashlib.sha256(url.encode()).hexdigest()[:16]}.html"
+        legacy.write_text("<p>Café</p>", encoding="utf-8")
+        assert get_cached_page(tmp_path, url) == "<p>Café</p>"
+        h = url_hash(url)
+        assert (tmp_path / h[:2] / f"{h}.html").read_bytes() == "<p>Café</p>".encode("utf-8")
+        legacy.unlink()
+        assert get_cached_page_bytes(tmp_path, url) == "<p>Café</p>".encode("utf-8")
+
+    def test_reads_legacy_post_entry_by_key(self, tmp_path: Path) -> None:
+        url = "https://api.example.com/search"
+        body = {"q": "japan"}
+        source = url + "|" + json.dumps(body, sort_keys=True)
+        (tmp_path / f"{legacy_key(source)}.html").write_text("results")
+        key = request_key(url, json_body=body)
+        assert get_cached_page_by_key(tmp_path, key) is None
+        assert get_cached_page_by_key(
+            tmp_path, key, legacy_source=legacy_request_source(url, json_body=body),
+        ) == "results"
+
+    def test_current_entry_wins_over_legacy(self, tmp_path: Path) -> None:
+        url = "https://example.com/legacy"
+        (tmp_path / f"{legacy_key(url)}.html").write_text("old")
+        save_cached_page(tmp_path, url, "new")
+        assert get_cached_page(tmp_path, url) == "new"
+
+    def test_save_keeps_other_memoized_pages(self, tmp_path: Path) -> None:
+        warm = save_cached_page(tmp_path, "https://example.com/warm", "warm")
+        assert get_cached_page(tmp_path, "https://example.com/warm") == "warm"
+        warm.unlink()
+        save_cached_page(tmp_path, "https://example.com/other", "other")
+        assert get_cached_page(tmp_path, "https://example.com/warm") == "warm"
+
+
+class TestFileMemo:
+    """Test the per-path memo behind the in-process cache layers."""
+
+    def test_hit_skips_load(self, tmp_path: Path) -> None:
+        loads: list = []
+        memo = FileMemo(lambda p: loads.append(p) or p.name, maxsize=4)
+        memo(tmp_path / "a")
+        memo(tmp_path / "a")
+        assert loads == [tmp_path / "a"]
+        assert memo.hits == 1
+
+    def test_misses_not_stored(self, tmp_path: Path) -> None:
+        memo = FileMemo(Path.read_bytes, maxsize=4)
+        with pytest.raises(FileNotFoundError):
+            memo(tmp_path / "missing")
+        (tmp_path / "missing").write_bytes(b"now here")
+        assert memo(tmp_path / "missing") == b"now here"
+
+    def test_discard_evicts_one_path(self, tmp_path: Path) -> None:
+        loads: list = []
+        memo = FileMemo(lambda p: loads.append(p.name) or p.name, maxsize=4)
+        memo(tmp_path / "a")
+        memo(tmp_path / "b")
+        memo.discard(tmp_path / "a")
+        memo(tmp_path / "a")
+        memo(tmp_path / "b")
+        assert loads == ["a", "b", "a"]
+
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        loads: list = []
+        memo = FileMemo(lambda p: loads.append(p.name) or p.name, maxsize=2)
+        for name in ["a", "b", "a", "c", "a", "b"]:
+            memo(tmp_path / name)
+        assert loads == ["a", "b", "c", "b"]
+
 
 class TestClassificationCache:
     """Test classification result cache read/write."""
@@ -116,6 +283,82 @@ class TestClassificationCache:
         assert cached["parent"]["value"] == 1000000000
         assert cached["children"][0]["value"] is None
 
+    def test_written_compact_utf8(self, tmp_path: Path) -> None:
+        cache_file = save_cached_classification(tmp_path, "t", {"title": "Café", "n": [1, 2]})
+        assert cache_file.read_bytes() == '{"title":"Café","n":[1,2]}'.encode("utf-8")
+
+    def test_by_key_matches_text_api(self, tmp_path: Path) -> None:
+        text = "Korea semiconductor investment"
+        result = {"is_tpd": False}
+        save_cached_classification_by_key(tmp_path, content_hash(text), result)
+        assert get_cached_classification(tmp_path, text) == result
+        assert get_cached_classification_by_key(tmp_path, content_hash(text)) == result
+
+    def test_repeat_hit_served_from_memory(self, tmp_path: Path) -> None:
+        save_cached_classification(tmp_path, "text", {"is_tpd": True})
+        first = get_cached_classification(tmp_path, "text")
+        cache_path(tmp_path, content_hash("text"), ".json").unlink()
+        assert get_cached_classification(tmp_path, "text") is first
+
+    def test_overwrite_invalidates_memory(self, tmp_path: Path) -> None:
+        save_cached_classification(tmp_path, "text", {"v": 1})
+        assert get_cached_classification(tmp_path, "text") == {"v": 1}
+        save_cached_classification(tmp_path, "text", {"v": 2})
+        assert get_cached_classification(tmp_path, "text") == {"v": 2}
+
+    def test_clear_cache_invalidates_memory(self, tmp_path: Path) -> None:
+        save_cached_classification(tmp_path, "text", {"v": 1})
+        get_cached_classification(tmp_path, "text")
+        clear_cache(tmp_path)
+        assert get_cached_classification(tmp_path, "text") is None
+
+    def test_reads_and_migrates_legacy_entry(self, tmp_path: Path) -> None:
+        # Written by the old cache: flat, pretty-printed <sha256[:16]>.json
+        text = "Japan semiconductor investment"
+        result = {"is_tpd": True, "title": "Café"}
+        legacy = tmp_path / f"{hashlib.sha256(text.encode()).hexdigest()[:16]}.json"
+        legacy.write_text(json.dumps(result, indent=2))
+        assert get_cached_classification(tmp_path, text) == result
+        migrated = cache_path(tmp_path, content_hash(text), ".json")
+        assert json.loads(migrated.read_bytes()) == result
+
+    def test_by_key_ignores_legacy_without_source(self, tmp_path: Path) -> None:
+        text = "Japan semiconductor investment"
+        (tmp_path / f"{legacy_key(text)}.json").write_text('{"is_tpd": true}')
+        assert get_cached_classification_by_key(tmp_path, content_hash(text)) is None
+        assert get_cached_classification_by_key(
+            tmp_path, content_hash(text), legacy_source=text,
+        ) == {"is_tpd": True}
+
+
+class TestClassificationCacheWriter:
+    """Test buffered classification cache writes."""
+
+    def test_pending_visible_before_flush(self, tmp_path: Path) -> None:
+        writer = ClassificationCacheWriter(tmp_path)
+        writer.add("abc", {"is_tpd": True})
+        assert writer.get("abc") == {"is_tpd": True}
+        assert list(tmp_path.glob("**/*.json")) == []
+
+    def test_flush_writes_readable_entries(self, tmp_path: Path) -> None:
+        writer = ClassificationCacheWriter(tmp_path)
+        writer.add(content_hash("text A"), {"is_tpd": False})
+        writer.add(content_hash("text B"), {"is_tpd": True})
+        assert writer.flush() == 2
+        assert get_cached_classification(tmp_path, "text A") == {"is_tpd": False}
+        assert get_cached_classification(tmp_path, "text B") == {"is_tpd": True}
+        assert writer.flush() == 0
+
+    def test_flushes_when_buffer_full(self, tmp_path: Path) -> None:
+        writer = ClassificationCacheWriter(tmp_path, flush_every=2)
+        writer.add("a", {"n": 1})
+        writer.add("b", {"n": 2})
+        assert len(list(tmp_path.glob("**/*.json"))) == 2
+
+    def test_get_falls_back_to_disk(self, tmp_path: Path) -> None:
+        save_cached_classification_by_key(tmp_path, "ondisk", {"is_tpd": True})
+        assert ClassificationCacheWriter(tmp_path).get("ondisk") == {"is_tpd": True}
+
 
 class TestClearCache:
     """Test cache clearing."""
@@ -132,6 +375,12 @@ class TestClearCache:
         assert clear_cache(tmp_path) == 2
         assert list(tmp_path.glob("*")) == []
 
+    def test_clears_shards(self, tmp_path: Path) -> None:
+        save_cached_page(tmp_path, "https://a.com", "a")
+        save_cached_page(tmp_path, "https://b.com", "b")
+        assert clear_cache(tmp_path) == 2
+        assert get_cached_page(tmp_path, "https://a.com") is None
+
     def test_preserves_subdirectories(self, tmp_path: Path) -> None:
         (tmp_path / "file.txt").write_text("x")
         subdir = tmp_path / "subdir"
@@ -6,14 +6,23 @@ Run with: PYTHONPATH=. python3 -m pytest tests/test_classifier.py -v
 """
 from __future__ import annotations
 
+import hashlib
+import json
+from types import SimpleNamespace
+from typing import List, Optional
+
 import pytest
 
 from pipeline.classifier import (
+    EXTRACTION_PROMPT,
     Classifier,
+    _build_prompt,
+    _parse_response_text,
     _country_name_from_code,
     passes_prefilter,
     truncate_text,
 )
+from pipeline.cache import ClassificationCacheWriter
 from pipeline.models import RawDeal
 
 
@@ -94,12 +103,73 @@ class TestTruncateText:
         result = truncate_text(text, max_tokens=600)
         assert "billion" in result
 
+    def test_detail_lines_respect_budget(self) -> None:
+        lines = ["intro " * 600]
+        lines.extend(["x"] * 5)
+        lines.extend(["- $5 billion deal for widgets and other goods"] * 30)
+        result = truncate_text("\n".join(lines), max_tokens=520)
+        assert len(result.split()) <= 520
+        assert "$5 billion" in result
+
     def test_exact_boundary(self) -> None:
         words = ["word"] * 800
         text = " ".join(words)
         result = truncate_text(text, max_tokens=800)
         assert result == text
 
+    # Output feeds content_hash, so it must stay byte-for-byte stable
+    _PINNED_LINES = ["alpha  beta\tgamma   delta " * 25] * 5 + [
+        "  - $5  billion   plant in   Ohio  ",
+        "short",
+        "•  $2 billion  chip fab  expansion",
+        "filler  text " * 200,
+    ]
+
+    def test_pinned_output_within_budget(self) -> None:
+        head = " ".join(["alpha beta gamma delta"] * 125)
+        result = truncate_text("\n".join(self._PINNED_LINES), max_tokens=600)
+        assert result == (
+            head + "\n\n---\n\n"
+            "- $5  billion   plant in   Ohio\n"
+            "•  $2 billion  chip fab  expansion"
+        )
+
+    def test_pinned_output_over_budget(self) -> None:
+        head = " ".join(["alpha beta gamma delta"] * 125)
+        result = truncate_text("\n".join(self._PINNED_LINES), max_tokens=505)
+        assert result == head + " --- - $5 billion plant"
+
+
+# ── Prompt building tests ──────────────────────────────────────────
+
+class TestBuildPrompt:
+    """Test the pre-split extraction prompt."""
+
+    def test_matches_format(self) -> None:
+        text = "US-Japan fact sheet"
+        assert _build_prompt(text) == EXTRACTION_PROMPT.format(text=text)
+
+    def test_braces_in_text_kept_verbatim(self) -> None:
+        assert "{not a field}" in _build_prompt("{not a field}")
+
+
+# ── Response parsing tests ─────────────────────────────────────────
+
+class TestParseResponseText:
+    """Test parsing the model's JSON reply."""
+
+    def test_plain_json(self) -> None:
+        assert _parse_response_text('{"is_tpd": false}') == {"is_tpd": False}
+
+    def test_strips_code_fence(self) -> None:
+        assert _parse_response_text('```json\n{"is_tpd": true}\n```') == {"is_tpd": True}
+
+    def test_strips_unterminated_fence(self) -> None:
+        assert _parse_response_text('```\n{"is_tpd": true}') == {"is_tpd": True}
+
+    def test_invalid_json_returns_none(self) -> None:
+        assert _parse_response_text("Sorry, I can't help with that.") is None
+
 
 # ── Country name helper tests ──────────────────────────────────────
 
@@ -123,14 +193,18 @@ class TestCountryNameFromCode:
 
 # ── Classifier._parse_result tests ────────────────────────────────
 
+_MIN_PARENT = {"title": "T", "summary": "S", "country_code": "KOR", "status": "SIGNED"}
+
+
 class TestParseResult:
     """Test converting API-style results into Deal objects."""
 
-    @pytest.fixture
+    # _parse_result is pure and RawDeal is frozen, so both are shared
+    @pytest.fixture(scope="class")
     def classifier(self) -> Classifier:
         return Classifier(prefilter_enabled=False, truncation_enabled=False)
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def sample_raw(self) -> RawDeal:
         return RawDeal(
             title="US-Korea TPD",
@@ -170,12 +244,7 @@ class TestParseResult:
     def test_tpd_returns_children(self, classifier: Classifier, sample_raw: RawDeal) -> None:
         data = {
             "is_tpd": True,
-            "parent": {
-                "title": "Test",
-                "summary": "Test",
-                "country_code": "KOR",
-                "status": "SIGNED",
-            },
+            "parent": _MIN_PARENT,
             "children": [
                 {
                     "title": "Korean Air Boeing Purchase",
@@ -205,7 +274,7 @@ class TestParseResult:
     def test_child_ids_sequential(self, classifier: Classifier, sample_raw: RawDeal) -> None:
         data = {
             "is_tpd": True,
-            "parent": {"title": "T", "summary": "S", "country_code": "KOR", "status": "SIGNED"},
+            "parent": _MIN_PARENT,
             "children": [
                 {"title": "A", "summary": "A", "status": "COMMITTED"},
                 {"title": "B", "summary": "B", "status": "COMMITTED"},
@@ -216,6 +285,202 @@ class TestParseResult:
         assert children[1].id.endswith("-002")
 
 
+# ── Classifier.classify_pages tests ────────────────────────────────
+
+class TestClassifyPages:
+    """Test concurrent classification with a stubbed API call."""
+
+    @pytest.fixture
+    def classifier(self, tmp_path, monkeypatch) -> Classifier:
+        c = Classifier(prefilter_enabled=False, truncation_enabled=False)
+        c._cache = ClassificationCacheWriter(tmp_path)
+
+        def fake_call_api(text: str) -> dict:
+            if "boom" in text:
+                raise RuntimeError("boom")
+            return {
+                "is_tpd": True,
+                "parent": {"title": text, "summary": "S", "country_code": "JPN", "status": "SIGNED"},
+                "children": [],
+            }
+
+        monkeypatch.setattr(c, "_call_api", fake_call_api)
+        return c
+
+    def test_results_in_input_order(self, classifier: Classifier) -> None:
+        items = [
+            (RawDeal(title=f"Deal {i}", source_url=f"https://example.com/{i}"), f"page {i}", i)
+            for i in range(1, 21)
+        ]
+        results = classifier.classify_pages(items, "tpd", max_workers=4)
+        assert [parent.title for parent, _ in results] == [f"page {i}" for i in range(1, 21)]
+        assert classifier.stats.new_api_calls == 20
+
+    def test_failure_returned_in_place(self, classifier: Classifier) -> None:
+        items = [
+            (RawDeal(title="A", source_url="https://example.com/a"), "page a", 1),
+            (RawDeal(title="B", source_url="https://example.com/b"), "boom", 2),
+        ]
+        results = classifier.classify_pages(items, "tpd")
+        assert results[0][0] is not None
+        assert isinstance(results[1], RuntimeError)
+
+    def test_duplicate_pages_call_api_once(self, classifier: Classifier) -> None:
+        items = [
+            (RawDeal(title=f"Deal {i}", source_url=f"https://example.com/{i}"), "same page", i)
+            for i in range(1, 5)
+        ]
+        results = classifier.classify_pages(items, "tpd", max_workers=4)
+        assert classifier.stats.new_api_calls == 1
+        assert [parent.id for parent, _ in results] == [f"tpd-jpn-{i}" for i in range(1, 5)]
+
+    def test_prefiltered_pages_skip_api(self, classifier: Classifier) -> None:
+        classifier.prefilter_enabled = True
+        items = [(RawDeal(title="Weather Report", source_url="https://example.com/w"), "sunny", 1)]
+        assert classifier.classify_pages(items, "tpd") == [(None, [])]
+        assert classifier.stats.new_api_calls == 0
+
+    def test_repeat_text_hits_cache(self, classifier: Classifier) -> None:
+        raw = RawDeal(title="A", source_url="https://example.com/a")
+        classifier.classify_pages([(raw, "same page", 1)], "tpd")
+        classifier.classify_pages([(raw, "same page", 2)], "tpd")
+        assert classifier.stats.new_api_calls == 1
+        assert classifier.stats.cache_hits == 1
+
+    def test_serves_flat_legacy_cache_entry(self, classifier: Classifier) -> None:
+        # The old layout: unsharded <cache_dir>/<sha256[:16]>.json, pretty-printed
+        text = "legacy page"
+        result = {"is_tpd": False}
+        legacy = classifier._cache.cache_dir / f"{hashlib.sha256(text.encode()).hexdigest()[:16]}.json"
+        legacy.write_text(json.dumps(result, indent=2))
+        raw = RawDeal(title="A", source_url="https://example.com/a")
+        assert classifier.classify_pages([(raw, text, 1)], "tpd") == [(None, [])]
+        assert classifier.stats.new_api_calls == 0
+        assert classifier.stats.cache_hits == 1
+
+
+class _FakeBatches:
+    """Minimal stand-in for client.messages.batches."""
+
+    def __init__(self) -> None:
+        self.requests: list = []
+        self.polls = 0
+        self.create_error: Optional[Exception] = None
+        self.status_after_poll = "ended"
+        self.cancelled: List[str] = []
+
+    def create(self, requests: list):
+        if self.create_error is not None:
+            raise self.create_error
+        self.requests = requests
+        return SimpleNamespace(id="batch-1", processing_status="in_progress")
+
+    def retrieve(self, batch_id: str):
+        self.polls += 1
+        return SimpleNamespace(id=batch_id, processing_status=self.status_after_poll)
+
+    def cancel(self, batch_id: str):
+        self.cancelled.append(batch_id)
+        return SimpleNamespace(id=batch_id, processing_status="canceling")
+
+    def results(self, batch_id: str):
+        for req in self.requests:
+            reply = json.dumps({
+                "is_tpd": True,
+                "parent": {"title": "T", "summary": "S", "country_code": "KOR", "status": "SIGNED"},
+                "children": [],
+            })
+            message = SimpleNamespace(content=[SimpleNamespace(text=reply)])
+            yield SimpleNamespace(
+                custom_id=req["custom_id"],
+                result=SimpleNamespace(type="succeeded", message=message),
+            )
+
+
+class TestClassifyPagesBatch:
+    """Test batch-mode classification against a fake Batches API."""
+
+    @pytest.fixture
+    def batches(self) -> _FakeBatches:
+        return _FakeBatches()
+
+    @pytest.fixture
+    def classifier(self, tmp_path, monkeypatch, batches: _FakeBatches) -> Classifier:
+        monkeypatch.setattr("pipeline.classifier.BATCH_POLL_SECONDS", 0)
+        c = Classifier(prefilter_enabled=False, truncation_enabled=False, batch_mode=True)
+        c._cache = ClassificationCacheWriter(tmp_path)
+        client = SimpleNamespace(messages=SimpleNamespace(batches=batches))
+        monkeypatch.setattr(c, "_get_client", lambda: client)
+        return c
+
+    def test_one_request_per_unique_page(self, classifier: Classifier, batches: _FakeBatches) -> None:
+        raw = RawDeal(title="A", source_url="https://example.com/a")
+        items = [(raw, "page one", 1), (raw, "page two", 2), (raw, "page one", 3)]
+        results = classifier.classify_pages(items, "tpd")
+        assert len(batches.requests) == 2
+        assert batches.polls == 1
+        assert all(parent is not None for parent, _ in results)
+        assert [parent.id for parent, _ in results] == ["tpd-kor-1", "tpd-kor-2", "tpd-kor-3"]
+        assert classifier.stats.new_api_calls == 2
+
+    def test_cached_pages_not_submitted(self, classifier: Classifier, batches: _FakeBatches) -> None:
+        raw = RawDeal(title="A", source_url="https://example.com/a")
+        classifier.classify_pages([(raw, "page one", 1)], "tpd")
+        batches.requests = []
+        classifier.classify_pages([(raw, "page one", 2)], "tpd")
+        assert batches.requests == []
+        assert classifier.stats.cache_hits == 1
+
+    def _direct_replies(self, classifier: Classifier, monkeypatch) -> List[str]:
+        calls: List[str] = []
+
+        def fake_call_api(text: str) -> dict:
+            calls.append(text)
+            return {"is_tpd": True, "parent": _MIN_PARENT, "children": []}
+
+        monkeypatch.setattr(classifier, "_call_api", fake_call_api)
+        return calls
+
+    def test_submit_error_falls_back_to_direct_calls(
+        self, classifier: Classifier, batches: _FakeBatches, monkeypatch,
+    ) -> None:
+        batches.create_error = RuntimeError("503 from batches.create")
+        calls = self._direct_replies(classifier, monkeypatch)
+        raw = RawDeal(title="A", source_url="https://example.com/a")
+        results = classifier.classify_pages([(raw, "page one", 1), (raw, "page two", 2)], "tpd")
+        assert sorted(calls) == ["page one", "page two"]
+        assert batches.cancelled == []  # nothing was submitted
+        assert [parent.id for parent, _ in results] == ["tpd-kor-1", "tpd-kor-2"]
+        assert classifier.stats.new_api_calls == 2
+
+    def test_poll_deadline_falls_back_to_direct_calls(
+        self, classifier: Classifier, batches: _FakeBatches, monkeypatch,
+    ) -> None:
+        monkeypatch.setattr("pipeline.classifier.BATCH_MAX_WAIT_SECONDS", 0)
+        batches.status_after_poll = "in_progress"
+        calls = self._direct_replies(classifier, monkeypatch)
+        raw = RawDeal(title="A", source_url="https://example.com/a")
+        [(parent, _)] = classifier.classify_pages([(raw, "page one", 1)], "tpd")
+        assert batches.cancelled == ["batch-1"]
+        assert calls == ["page one"]
+        assert parent is not None
+
+    def test_cancel_failure_still_falls_back(
+        self, classifier: Classifier, batches: _FakeBatches, monkeypatch,
+    ) -> None:
+        monkeypatch.setattr("pipeline.classifier.BATCH_MAX_WAIT_SECONDS", 0)
+        batches.status_after_poll = "in_progress"
+
+        def broken_cancel(batch_id: str):
+            raise RuntimeError("cancel failed")
+
+        monkeypatch.setattr(batches, "cancel", broken_cancel)
+        calls = self._direct_replies(classifier, monkeypatch)
+        raw = RawDeal(title="A", source_url="https://example.com/a")
+        classifier.classify_pages([(raw, "page one", 1)], "tpd")
+        assert calls == ["page one"]
+
+
 # ── Cost estimation tests ──────────────────────────────────────────
 
 class TestEstimateCost:
@@ -5,16 +5,22 @@ Run with: PYTHONPATH=. python3 -m pytest tests/test_config.py -v
 """
 from __future__ import annotations
 
+import os
 from pathlib import Path
+from typing import Dict
+
+import pytest
 
 from pipeline.config import (
     BACKOFF_START_SECONDS,
+    COUNTRY_CODE_TO_FORMAL,
     COUNTRY_WATCHLIST,
     DEAL_KEYWORDS,
     DEFAULT_MODEL,
     MAX_INPUT_TOKENS,
     MAX_RETRIES,
     PREFILTER_KEYWORDS,
+    PREFILTER_KEYWORDS_LOWER,
     PREMIUM_MODEL,
     PROJECT_ROOT,
     REQUEST_DELAY_SECONDS,
@@ -25,6 +31,14 @@ from pipeline.config import (
     USER_AGENT,
 )
 
+# Lowercased alias sets per watchlist key, for case-insensitive membership
+_NAMES_LOWER = {
+    key: frozenset(n.lower() for n in info["names"])
+    for key, info in COUNTRY_WATCHLIST.items()
+}
+_TECH_LOWER = frozenset(k.lower() for k in TECH_KEYWORDS)
+_DEAL_LOWER = frozenset(k.lower() for k in DEAL_KEYWORDS)
+
 
 class TestCountryWatchlist:
     """Validate COUNTRY_WATCHLIST structure."""
@@ -52,16 +66,13 @@ class TestCountryWatchlist:
                 assert isinstance(name, str), f"{key} has non-string name: {name}"
 
     def test_primary_names_present(self) -> None:
-        uk_names = [n.lower() for n in COUNTRY_WATCHLIST["UK"]["names"]]
-        assert "united kingdom" in uk_names
-        assert "uk" in uk_names
-
-        jpn_names = [n.lower() for n in COUNTRY_WATCHLIST["Japan"]["names"]]
-        assert "japan" in jpn_names
+        assert {"united kingdom", "uk"} <= _NAMES_LOWER["UK"]
+        assert "japan" in _NAMES_LOWER["Japan"]
+        assert {"south korea", "korea"} <= _NAMES_LOWER["South Korea"]
 
-        kor_names = [n.lower() for n in COUNTRY_WATCHLIST["South Korea"]["names"]]
-        assert "south korea" in kor_names
-        assert "korea" in kor_names
+    def test_code_to_formal_covers_watchlist(self) -> None:
+        assert set(COUNTRY_CODE_TO_FORMAL) == {info["code"] for info in COUNTRY_WATCHLIST.values()}
+        assert COUNTRY_CODE_TO_FORMAL["KOR"] == "Republic of Korea"
 
 
 class TestKeywords:
@@ -74,19 +85,18 @@ class TestKeywords:
         assert len(DEAL_KEYWORDS) > 0
 
     def test_prefilter_is_union(self) -> None:
-        assert set(PREFILTER_KEYWORDS) == set(TECH_KEYWORDS + DEAL_KEYWORDS)
+        diff = frozenset(PREFILTER_KEYWORDS) ^ frozenset(TECH_KEYWORDS).union(DEAL_KEYWORDS)
+        assert not diff, f"Prefilter keywords out of sync: {sorted(diff)}"
+
+    def test_prefilter_lower_matches_keywords(self) -> None:
+        assert PREFILTER_KEYWORDS_LOWER == tuple(k.lower() for k in PREFILTER_KEYWORDS)
 
     def test_core_tech_keywords_present(self) -> None:
-        kw_lower = [k.lower() for k in TECH_KEYWORDS]
-        assert "ai" in kw_lower or "artificial intelligence" in kw_lower
-        assert "semiconductor" in kw_lower
-        assert "quantum" in kw_lower
+        assert "ai" in _TECH_LOWER or "artificial intelligence" in _TECH_LOWER
+        assert {"semiconductor", "quantum"} <= _TECH_LOWER
 
     def test_core_deal_keywords_present(self) -> None:
-        kw_lower = [k.lower() for k in DEAL_KEYWORDS]
-        assert "prosperity" in kw_lower
-        assert "agreement" in kw_lower
-        assert "investment" in kw_lower
+        assert {"prosperity", "agreement", "investment"} <= _DEAL_LOWER
 
 
 class TestSources:
@@ -150,14 +160,21 @@ class TestModelConfig:
             int(part)  # should not raise
 
 
+@pytest.fixture(scope="session")
+def project_layout() -> Dict[str, bool]:
+    """Top-level entries of PROJECT_ROOT mapped to is-directory, from one scandir."""
+    with os.scandir(PROJECT_ROOT) as entries:
+        return {e.name: e.is_dir() for e in entries}
+
+
 class TestPaths:
     """Validate path configuration."""
 
-    def test_project_root_exists(self) -> None:
-        assert PROJECT_ROOT.exists()
+    def test_project_root_exists(self, project_layout: Dict[str, bool]) -> None:
+        assert project_layout, f"{PROJECT_ROOT} is missing or empty"
 
-    def test_project_root_has_pipeline(self) -> None:
-        assert (PROJECT_ROOT / "pipeline").is_dir()
+    def test_project_root_has_pipeline(self, project_layout: Dict[str, bool]) -> None:
+        assert project_layout.get("pipeline") is True
 
-    def test_project_root_has_data(self) -> None:
-        assert (PROJECT_ROOT / "data").is_dir()
+    def test_project_root_has_data(self, project_layout: Dict[str, bool]) -> None:
+        assert project_layout.get("data") is True
@@ -5,12 +5,23 @@ Run with: PYTHONPATH=. python3 -m pytest tests/ -v
 from __future__ import annotations
 
 import json
+import re
+from collections import Counter
 from pathlib import Path
 
 import pytest
 
 from pipeline.config import COUNTRY_WATCHLIST
 from pipeline.models import DealsOutput, DealStatus, DealType
+from pipeline.scrapers.base import title_matches_watchlist
+from tests._helpers import DealsPartition
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_VALID_COUNTRY_CODES = frozenset(info["code"] for info in COUNTRY_WATCHLIST.values())
+_VALID_DEAL_TYPES = frozenset(t.value for t in DealType)
+_VALID_DEAL_STATUSES = frozenset(s.value for s in DealStatus)
+_VALID_SOURCES = frozenset({"federal_register", "whitehouse", "commerce", "ustr"})
+_REQUIRED_DEAL_FIELDS = frozenset({"id", "title", "summary", "type", "status", "country", "date", "source_url"})
 
 
 # ── Schema validation ────────────────────────────────────────────────
@@ -22,13 +33,13 @@ class TestDealsJsonSchema:
         assert deals_json_path.exists(), "data/deals.json must exist"
 
     def test_deals_json_is_valid_json(self, deals_json_path: Path) -> None:
-        data = json.loads(deals_json_path.read_text())
+        # Stdlib parser on purpose: the file must be plain-JSON compliant
+        data = json.loads(deals_json_path.read_bytes())
         assert isinstance(data, dict)
 
-    def test_deals_json_validates_against_schema(self, deals_data: dict) -> None:
-        output = DealsOutput.model_validate(deals_data)
-        assert output.meta is not None
-        assert isinstance(output.items, list)
+    def test_deals_json_validates_against_schema(self, deals_output: DealsOutput) -> None:
+        assert deals_output.meta is not None
+        assert isinstance(deals_output.items, list)
 
     def test_has_items(self, deals_data: dict) -> None:
         assert len(deals_data["items"]) > 0, "deals.json should have at least one deal"
@@ -40,10 +51,9 @@ class TestSampleJsonSchema:
     def test_sample_json_exists(self, sample_json_path: Path) -> None:
         assert sample_json_path.exists(), "data/deals.sample.json must exist"
 
-    def test_sample_json_validates_against_schema(self, sample_data: dict) -> None:
-        output = DealsOutput.model_validate(sample_data)
-        assert output.meta is not None
-        assert len(output.items) > 0
+    def test_sample_json_validates_against_schema(self, sample_output: DealsOutput) -> None:
+        assert sample_output.meta is not None
+        assert len(sample_output.items) > 0
 
 
 # ── Meta field validation ────────────────────────────────────────────
@@ -60,15 +70,13 @@ class TestMetaFields:
     def test_countries_tracked(self, deals_data: dict) -> None:
         countries = deals_data["meta"].get("countries_tracked", [])
         assert len(countries) > 0, "Should track at least one country"
-        valid_codes = {info["code"] for info in COUNTRY_WATCHLIST.values()}
         for code in countries:
-            assert code in valid_codes, f"Unknown country code: {code}"
+            assert code in _VALID_COUNTRY_CODES, f"Unknown country code: {code}"
 
     def test_sources_scraped(self, deals_data: dict) -> None:
         sources = deals_data["meta"].get("sources_scraped", [])
-        valid_sources = {"federal_register", "whitehouse", "commerce", "ustr"}
         for source in sources:
-            assert source in valid_sources, f"Unknown source: {source}"
+            assert source in _VALID_SOURCES, f"Unknown source: {source}"
 
 
 # ── Deal field validation ────────────────────────────────────────────
@@ -77,27 +85,25 @@ class TestDealFields:
     """Validate individual deal items."""
 
     def test_all_deals_have_required_fields(self, deals_data: dict) -> None:
-        required = {"id", "title", "summary", "type", "status", "country", "date", "source_url"}
         for deal in deals_data["items"]:
-            missing = required - set(deal.keys())
+            # Dict views support set ops directly — no set(deal) copy per deal
+            missing = _REQUIRED_DEAL_FIELDS - deal.keys()
             assert not missing, f"Deal {deal.get('id', '?')} missing fields: {missing}"
 
     def test_no_duplicate_ids(self, deals_data: dict) -> None:
-        ids = [deal["id"] for deal in deals_data["items"]]
-        duplicates = [x for x in ids if ids.count(x) > 1]
-        assert not duplicates, f"Duplicate deal IDs: {set(duplicates)}"
+        counts = Counter(deal["id"] for deal in deals_data["items"])
+        duplicates = {deal_id for deal_id, n in counts.items() if n > 1}
+        assert not duplicates, f"Duplicate deal IDs: {duplicates}"
 
     def test_valid_deal_types(self, deals_data: dict) -> None:
-        valid_types = {t.value for t in DealType}
         for deal in deals_data["items"]:
-            assert deal["type"] in valid_types, (
+            assert deal["type"] in _VALID_DEAL_TYPES, (
                 f"Deal {deal['id']} has invalid type: {deal['type']}"
             )
 
     def test_valid_deal_statuses(self, deals_data: dict) -> None:
-        valid_statuses = {s.value for s in DealStatus}
         for deal in deals_data["items"]:
-            assert deal["status"] in valid_statuses, (
+            assert deal["status"] in _VALID_DEAL_STATUSES, (
                 f"Deal {deal['id']} has invalid status: {deal['status']}"
             )
 
@@ -110,10 +116,8 @@ class TestDealFields:
                 )
 
     def test_dates_are_valid_format(self, deals_data: dict) -> None:
-        import re
-        date_pattern = re.compile(r"^\d{4}-\d{2}-\d{2}$")
         for deal in deals_data["items"]:
-            assert date_pattern.match(deal["date"]), (
+            assert _DATE_RE.fullmatch(deal["date"]), (
                 f"Deal {deal['id']} has invalid date format: {deal['date']}"
             )
 
@@ -123,39 +127,31 @@ class TestDealFields:
 class TestHierarchy:
     """Validate parent-child deal relationships."""
 
-    def test_parent_deals_exist(self, deals_data: dict) -> None:
-        parents = [d for d in deals_data["items"] if d.get("parent_id") is None]
-        assert len(parents) > 0, "Should have at least one parent TPD"
+    def test_parent_deals_exist(self, deals_partition: DealsPartition) -> None:
+        assert len(deals_partition.parents) > 0, "Should have at least one parent TPD"
 
-    def test_child_deals_reference_valid_parents(self, deals_data: dict) -> None:
-        parent_ids = {d["id"] for d in deals_data["items"] if d.get("parent_id") is None}
-        for deal in deals_data["items"]:
-            pid = deal.get("parent_id")
-            if pid is not None:
-                assert pid in parent_ids, (
-                    f"Child deal {deal['id']} references non-existent parent: {pid}"
-                )
+    def test_child_deals_reference_valid_parents(self, deals_partition: DealsPartition) -> None:
+        for deal in deals_partition.children:
+            pid = deal["parent_id"]
+            assert pid in deals_partition.parent_ids, (
+                f"Child deal {deal['id']} references non-existent parent: {pid}"
+            )
 
-    def test_parent_deals_have_no_parent(self, deals_data: dict) -> None:
-        for deal in deals_data["items"]:
-            if deal.get("parent_id") is None:
-                # Parent deals should be TRADE type (framework agreements)
-                assert deal["type"] == "TRADE", (
-                    f"Parent deal {deal['id']} should be type TRADE, got {deal['type']}"
-                )
+    def test_parent_deals_have_no_parent(self, deals_partition: DealsPartition) -> None:
+        for deal in deals_partition.parents:
+            # Parent deals should be TRADE type (framework agreements)
+            assert deal["type"] == "TRADE", (
+                f"Parent deal {deal['id']} should be type TRADE, got {deal['type']}"
+            )
 
-    def test_child_deals_have_same_country_as_parent(self, deals_data: dict) -> None:
-        parent_countries = {
-            d["id"]: d["country"]
-            for d in deals_data["items"]
-            if d.get("parent_id") is None
-        }
-        for deal in deals_data["items"]:
-            pid = deal.get("parent_id")
-            if pid is not None and pid in parent_countries:
-                assert deal["country"] == parent_countries[pid], (
+    def test_child_deals_have_same_country_as_parent(self, deals_partition: DealsPartition) -> None:
+        parent_country = deals_partition.parent_country
+        for deal in deals_partition.children:
+            pid = deal["parent_id"]
+            if pid in parent_country:
+                assert deal["country"] == parent_country[pid], (
                     f"Child {deal['id']} country ({deal['country']}) "
-                    f"doesn't match parent {pid} country ({parent_countries[pid]})"
+                    f"doesn't match parent {pid} country ({parent_country[pid]})"
                 )
 
 
@@ -165,9 +161,8 @@ class TestCountries:
     """Validate country codes in deals."""
 
     def test_country_codes_are_valid(self, deals_data: dict) -> None:
-        valid_codes = {info["code"] for info in COUNTRY_WATCHLIST.values()}
         for deal in deals_data["items"]:
-            assert deal["country"] in valid_codes, (
+            assert deal["country"] in _VALID_COUNTRY_CODES, (
                 f"Deal {deal['id']} has unknown country code: {deal['country']}"
             )
 
@@ -213,27 +208,22 @@ class TestScraperFilters:
     """Test the title matching filter used by scrapers."""
 
     def test_matches_prosperity(self) -> None:
-        from pipeline.scrapers.base import title_matches_watchlist
         assert title_matches_watchlist("Technology Prosperity Deal")
 
     def test_matches_country_plus_keyword(self) -> None:
-        from pipeline.scrapers.base import title_matches_watchlist
         assert title_matches_watchlist("Japan bilateral technology agreement")
         assert title_matches_watchlist("UK trade deal partnership")
         assert title_matches_watchlist("South Korea semiconductor investment")
 
     def test_rejects_unrelated(self) -> None:
-        from pipeline.scrapers.base import title_matches_watchlist
         assert not title_matches_watchlist("Random news article about weather")
         assert not title_matches_watchlist("US domestic policy update")
 
     def test_country_filter(self) -> None:
-        from pipeline.scrapers.base import title_matches_watchlist
         assert title_matches_watchlist("Japan technology deal", country_filter="Japan")
         assert not title_matches_watchlist("Japan technology deal", country_filter="UK")
 
     def test_matches_broader_tpd_phrases(self) -> None:
-        from pipeline.scrapers.base import title_matches_watchlist
         assert title_matches_watchlist(
             "President Trump Brings Home Billion Dollar Deals During State Visit to Korea"
         )
@@ -24,10 +24,13 @@ from pipeline.models import (
 class TestDealType:
     """Test DealType enum."""
 
-    def test_valid_values(self) -> None:
-        assert DealType.GOVERNMENT == "GOVERNMENT"
-        assert DealType.BUSINESS == "BUSINESS"
-        assert DealType.TRADE == "TRADE"
+    @pytest.mark.parametrize("name, value", [
+        ("GOVERNMENT", "GOVERNMENT"),
+        ("BUSINESS", "BUSINESS"),
+        ("TRADE", "TRADE"),
+    ])
+    def test_valid_values(self, name: str, value: str) -> None:
+        assert DealType[name] == value
 
     def test_all_three_types(self) -> None:
         assert len(DealType) == 3
@@ -36,13 +39,16 @@ class TestDealType:
 class TestDealStatus:
     """Test DealStatus enum."""
 
-    def test_valid_values(self) -> None:
-        assert DealStatus.SIGNED == "SIGNED"
-        assert DealStatus.COMMITTED == "COMMITTED"
-        assert DealStatus.IN_PROGRESS == "IN_PROGRESS"
-        assert DealStatus.COMPLETED == "COMPLETED"
-        assert DealStatus.STALLED == "STALLED"
-        assert DealStatus.UNVERIFIED == "UNVERIFIED"
+    @pytest.mark.parametrize("name, value", [
+        ("SIGNED", "SIGNED"),
+        ("COMMITTED", "COMMITTED"),
+        ("IN_PROGRESS", "IN_PROGRESS"),
+        ("COMPLETED", "COMPLETED"),
+        ("STALLED", "STALLED"),
+        ("UNVERIFIED", "UNVERIFIED"),
+    ])
+    def test_valid_values(self, name: str, value: str) -> None:
+        assert DealStatus[name] == value
 
     def test_all_six_statuses(self) -> None:
         assert len(DealStatus) == 6
@@ -83,20 +89,32 @@ class TestRawDeal:
         )
         assert raw.source_name == "whitehouse"
 
+    def test_frozen_and_hashable(self) -> None:
+        raw = RawDeal(title="Test", source_url="https://example.com")
+        with pytest.raises(ValidationError):
+            raw.title = "Changed"  # type: ignore[misc]
+        assert raw in {RawDeal(title="Test", source_url="https://example.com")}
+
+
+@pytest.fixture(scope="module")
+def minimal_deal() -> Deal:
+    """A parent Deal with only required fields, validated once (don't mutate)."""
+    return Deal(
+        id="tpd-jpn-2025",
+        source_url="https://example.com",
+        title="US-Japan TPD",
+        summary="Test",
+        type=DealType.TRADE,
+        status=DealStatus.SIGNED,
+        date="2025-10-28",
+    )
+
 
 class TestDeal:
     """Test Deal model."""
 
-    def test_minimal_parent(self) -> None:
-        deal = Deal(
-            id="tpd-jpn-2025",
-            source_url="https://example.com",
-            title="US-Japan TPD",
-            summary="Test",
-            type=DealType.TRADE,
-            status=DealStatus.SIGNED,
-            date="2025-10-28",
-        )
+    def test_minimal_parent(self, minimal_deal: Deal) -> None:
+        deal = minimal_deal
         assert deal.parent_id is None
         assert deal.deal_value_usd is None
         assert deal.parties == []
@@ -141,17 +159,8 @@ class TestDeal:
                 date="2025-01-01",
             )
 
-    def test_default_country(self) -> None:
-        deal = Deal(
-            id="test",
-            source_url="https://example.com",
-            title="Test",
-            summary="Test",
-            type=DealType.TRADE,
-            status=DealStatus.SIGNED,
-            date="2025-01-01",
-        )
-        assert deal.country == "USA"
+    def test_default_country(self, minimal_deal: Deal) -> None:
+        assert minimal_deal.country == "USA"
 
 
 class TestMeta:
@@ -201,19 +210,10 @@ class TestDealsOutput:
         output = DealsOutput(meta=Meta(generated_at="2025-01-01T00:00:00Z"))
         assert output.items == []
 
-    def test_with_items(self) -> None:
-        deal = Deal(
-            id="test",
-            source_url="https://example.com",
-            title="Test",
-            summary="Test",
-            type=DealType.TRADE,
-            status=DealStatus.SIGNED,
-            date="2025-01-01",
-        )
+    def test_with_items(self, minimal_deal: Deal) -> None:
         output = DealsOutput(
             meta=Meta(generated_at="2025-01-01T00:00:00Z"),
-            items=[deal],
+            items=[minimal_deal],
         )
         assert len(output.items) == 1
 
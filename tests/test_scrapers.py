@@ -5,9 +5,22 @@ Run with: PYTHONPATH=. python3 -m pytest tests/test_scrapers.py -v
 """
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
+import time
+from typing import List, Optional
+
 import pytest
 
-from pipeline.scrapers.base import extract_text_from_html, title_matches_watchlist
+from pipeline.config import COUNTRY_WATCHLIST, SOURCES
+from pipeline.models import RawDeal
+from pipeline.scrapers import base
+from pipeline.scrapers.base import BaseScraper, extract_text_from_html, title_matches_watchlist
+from pipeline.scrapers.commerce import CommerceScraper
+from pipeline.scrapers.federal_register import FederalRegisterScraper, _build_fr_url
+from pipeline.scrapers.ustr import USTRScraper
+from pipeline.scrapers.whitehouse import WhiteHouseScraper
 
 
 # ── HTML text extraction ───────────────────────────────────────────
@@ -64,69 +77,330 @@ class TestExtractTextFromHtml:
         text = extract_text_from_html("")
         assert text == ""
 
+    def test_utf8_bytes_input(self) -> None:
+        html = '<html><head><meta charset="iso-8859-1"></head><body><p>Séoul — deal</p></body></html>'
+        text = extract_text_from_html(html.encode("utf-8"))
+        assert "Séoul — deal" in text
+
     def test_strips_style_tags(self) -> None:
         html = "<html><head><style>body{color:red}</style></head><body><p>Content</p></body></html>"
         text = extract_text_from_html(html)
         assert "color:red" not in text
         assert "Content" in text
 
+    def test_keeps_text_after_removed_tag(self) -> None:
+        html = "<html><body><p>Before<script>x()</script> after</p></body></html>"
+        text = extract_text_from_html(html)
+        assert "Before" in text
+        assert "after" in text
+        assert "x()" not in text
+
+    def test_text_around_removed_tag_stays_separate(self) -> None:
+        html = "<html><body><p>Seoul<script>x()</script>Summit</p></body></html>"
+        assert extract_text_from_html(html) == "Seoul\nSummit"
+
+    def test_ignores_article_inside_nav(self) -> None:
+        html = "<html><body><nav><article>Menu</article></nav><main>Body</main></body></html>"
+        assert extract_text_from_html(html) == "Body"
+
+    def test_content_class_div_fallback(self) -> None:
+        html = '<html><body><div>Sidebar</div><div class="entry-content"><p>Body</p></div></body></html>'
+        assert extract_text_from_html(html) == "Body"
+
 
 # ── Title matching (extended tests beyond test_data_validation.py) ─
 
 class TestTitleMatchesWatchlist:
     """Extended title matching tests."""
 
-    def test_prosperity_always_matches(self) -> None:
-        assert title_matches_watchlist("Technology Prosperity Deal Announced")
+    @pytest.mark.parametrize("title, country_filter, expected", [
+        # "prosperity" always matches
+        ("Technology Prosperity Deal Announced", None, True),
+        # Country plus a tech keyword
+        ("Japan AI framework agreement", None, True),
+        ("UK quantum computing partnership", None, True),
+        ("South Korea semiconductor investment", None, True),
+        # Country plus a deal keyword
+        ("Japan bilateral trade agreement", None, True),
+        ("Korea MOU on technology cooperation", None, True),
+        # Country name alone does not match
+        ("Japan weather forecast", None, False),
+        ("UK sports results", None, False),
+        # Keyword alone does not match
+        ("New AI regulation in Europe", None, False),
+        ("Semiconductor shortage continues", None, False),
+        # Case-insensitive
+        ("JAPAN TECHNOLOGY DEAL", None, True),
+        ("united kingdom ai partnership", None, True),
+        # A country filter restricts matching to that country
+        ("Japan technology deal", "Japan", True),
+        ("Japan technology deal", "UK", False),
+        # "France" is not a watchlist key, so all countries are checked
+        ("Japan technology deal", "France", True),
+        # Korean and UK variant names
+        ("ROK bilateral technology deal", None, True),
+        ("Republic of Korea semiconductor agreement", None, True),
+        ("Korean Air investment deal", None, True),
+        ("Britain technology partnership deal", None, True),
+        ("British semiconductor agreement", None, True),
+        # Punctuation in names like "U.K." is matched literally, not as a regex
+        ("U.K. technology deal", None, True),
+        ("UXKX technology deal", None, False),
+        # Broader TPD phrases
+        ("President Trump Brings Home Billion Dollar Deals During State Visit to Korea", None, True),
+        ("Fact Sheet: US-Japan Technology Partnership", None, True),
+        ("US-Japan Summit Joint Statement", None, True),
+    ])
+    def test_title_matcher(self, title: str, country_filter: Optional[str], expected: bool) -> None:
+        assert title_matches_watchlist(title, country_filter=country_filter) is expected
 
-    def test_country_plus_tech_keyword(self) -> None:
-        assert title_matches_watchlist("Japan AI framework agreement")
-        assert title_matches_watchlist("UK quantum computing partnership")
-        assert title_matches_watchlist("South Korea semiconductor investment")
+    def test_every_alias_matches_under_its_own_filter(self) -> None:
+        """The per-filter patterns built at import cover every watchlist alias."""
+        for key, info in COUNTRY_WATCHLIST.items():
+            for name in info["names"]:
+                assert title_matches_watchlist(f"{name} technology deal", country_filter=key), name
 
-    def test_country_plus_deal_keyword(self) -> None:
-        assert title_matches_watchlist("Japan bilateral trade agreement")
-        assert title_matches_watchlist("Korea MOU on technology cooperation")
+    def test_repeat_titles_are_memoized(self) -> None:
+        title_matches_watchlist.cache_clear()
+        for _ in range(3):
+            assert title_matches_watchlist("Japan semiconductor agreement", "Japan")
+        info = title_matches_watchlist.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
 
-    def test_rejects_country_alone(self) -> None:
-        """Country name without a tech/deal keyword should not match."""
-        assert not title_matches_watchlist("Japan weather forecast")
-        assert not title_matches_watchlist("UK sports results")
 
-    def test_rejects_keyword_alone(self) -> None:
-        """Tech/deal keyword without country should not match (unless 'prosperity')."""
-        assert not title_matches_watchlist("New AI regulation in Europe")
-        assert not title_matches_watchlist("Semiconductor shortage continues")
+# ── Extracted text cache (Layer 2) ─────────────────────────────────
 
-    def test_case_insensitive(self) -> None:
-        assert title_matches_watchlist("JAPAN TECHNOLOGY DEAL")
-        assert title_matches_watchlist("united kingdom ai partnership")
+class TestExtractedTextCache:
+    """Test the Layer 2 extracted-text cache and its in-process memo."""
 
-    def test_country_filter_restricts(self) -> None:
-        assert title_matches_watchlist("Japan technology deal", country_filter="Japan")
-        assert not title_matches_watchlist("Japan technology deal", country_filter="UK")
+    @pytest.fixture(autouse=True)
+    def _tmp_cache(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(base, "EXTRACTED_CACHE_DIR", tmp_path)
+        base._load_extracted_text.cache_clear()
 
-    def test_country_filter_unknown_checks_all(self) -> None:
-        """Unknown country filter falls through to checking all countries."""
-        # "France" is not a watchlist key, so all countries are checked
-        assert title_matches_watchlist("Japan technology deal", country_filter="France")
+    def test_miss_returns_none(self) -> None:
+        assert base._get_extracted_text("https://example.com/none") is None
+
+    def test_repeat_hits_served_from_memory(self) -> None:
+        url = "https://example.com/a"
+        base._save_extracted_text(url, "Séoul text")
+        assert base._get_extracted_text(url) == "Séoul text"
+        assert base._get_extracted_text(url) == "Séoul text"
+        assert base._load_extracted_text.hits == 1
+
+    def test_save_keeps_other_memoized_texts(self, tmp_path) -> None:
+        base._save_extracted_text("https://example.com/warm", "warm")
+        assert base._get_extracted_text("https://example.com/warm") == "warm"
+        for f in tmp_path.rglob("*.txt.z"):
+            f.unlink()
+        base._save_extracted_text("https://example.com/other", "other")
+        assert base._get_extracted_text("https://example.com/warm") == "warm"
+
+    def test_stored_compressed(self, tmp_path) -> None:
+        url = "https://example.com/a"
+        base._save_extracted_text(url, "semiconductor " * 200)
+        [stored] = tmp_path.rglob("*.txt.z")
+        assert stored.stat().st_size < len("semiconductor " * 200)
+
+    def test_reads_legacy_plain_text(self, tmp_path) -> None:
+        # The layout older versions wrote: flat dir, truncated SHA-256 name
+        url = "https://example.com/legacy"
+        legacy = tmp_path / f"{hashlib.sha256(url.encode()).hexdigest()[:16]}.txt"
+        legacy.write_bytes("plain text".encode("utf-8"))
+        assert base._get_extracted_text(url) == "plain text"
+
+    def test_compressed_entry_wins_over_legacy(self, tmp_path) -> None:
+        url = "https://example.com/legacy"
+        (tmp_path / f"{hashlib.sha256(url.encode()).hexdigest()[:16]}.txt").write_bytes(b"old")
+        base._save_extracted_text(url, "new")
+        assert base._get_extracted_text(url) == "new"
+
+    def test_save_invalidates_memo(self) -> None:
+        url = "https://example.com/a"
+        base._save_extracted_text(url, "old")
+        assert base._get_extracted_text(url) == "old"
+        base._save_extracted_text(url, "new")
+        assert base._get_extracted_text(url) == "new"
 
-    def test_korean_variant_names(self) -> None:
-        assert title_matches_watchlist("ROK bilateral technology deal")
-        assert title_matches_watchlist("Republic of Korea semiconductor agreement")
-        assert title_matches_watchlist("Korean Air investment deal")
 
-    def test_uk_variant_names(self) -> None:
-        assert title_matches_watchlist("Britain technology partnership deal")
-        assert title_matches_watchlist("British semiconductor agreement")
+# ── Commerce listing parsing ───────────────────────────────────────
 
-    def test_billion_dollar_phrase(self) -> None:
-        assert title_matches_watchlist(
-            "President Trump Brings Home Billion Dollar Deals During State Visit to Korea"
+class TestCommerceListingParse:
+    """Test (title, url) extraction from a Commerce.gov listing page."""
+
+    def test_parses_news_links(self) -> None:
+        html = """
+        <html><body>
+        <a href="/news/fact-sheets/2025/05/us-uk-deal"><span>US-UK</span> <b>Technology Deal</b></a>
+        <a href="/about">About the Department of Commerce</a>
+        <a href="/news/press-releases/short">Short</a>
+        <a>No href at all, long enough</a>
+        </body></html>
+        """
+        results = CommerceScraper()._parse_listing_page(html)
+        assert results == [(
+            "US-UKTechnology Deal",
+            "https://www.commerce.gov/news/fact-sheets/2025/05/us-uk-deal",
+        )]
+
+    def test_empty_page(self) -> None:
+        assert CommerceScraper()._parse_listing_page("") == []
+
+    @pytest.mark.parametrize("url, expected", [
+        ("https://www.commerce.gov/news/fact-sheets/2025/09/us-japan-deal", "2025-09-01"),
+        ("https://www.commerce.gov/news/2025/2024/05/x", "2024-05-01"),
+        ("https://www.commerce.gov/news/press-releases/us-japan-deal", ""),
+        ("https://www.commerce.gov/2025/09", ""),
+    ])
+    def test_extract_date_from_url(self, url: str, expected: str) -> None:
+        assert CommerceScraper()._extract_date_from_url(url) == expected
+
+
+# ── White House / USTR listing parsing ─────────────────────────────
+
+class TestWhiteHouseAndUSTRListingParse:
+    """Test (title, url) extraction from White House and USTR listing pages."""
+
+    def test_whitehouse_keeps_article_links(self) -> None:
+        html = """
+        <html><body>
+        <a href="/fact-sheets/2025/09/us-uk-technology-prosperity-deal/">US-UK Technology Prosperity Deal</a>
+        <a href="/about-the-white-house/">About the White House</a>
+        <a href="/articles/short/">Short</a>
+        </body></html>
+        """
+        assert WhiteHouseScraper()._parse_listing_page(html) == [(
+            "US-UK Technology Prosperity Deal",
+            "https://www.whitehouse.gov/fact-sheets/2025/09/us-uk-technology-prosperity-deal/",
+        )]
+
+    def test_ustr_keeps_content_links(self) -> None:
+        html = """
+        <html><body>
+        <a href="/about-us/policy-offices/press-office/press-releases/2025/may/us-uk-deal">US-UK Economic Prosperity Deal</a>
+        <a href="https://ustr.gov/trade-agreements/free-trade-agreements">Free Trade Agreements</a>
+        <a href="/issue-areas/enforcement">Enforcement and monitoring</a>
+        </body></html>
+        """
+        assert USTRScraper()._parse_listing_page(html) == [
+            ("US-UK Economic Prosperity Deal",
+             "https://ustr.gov/about-us/policy-offices/press-office/press-releases/2025/may/us-uk-deal"),
+            ("Free Trade Agreements", "https://ustr.gov/trade-agreements/free-trade-agreements"),
+        ]
+
+
+# ── Federal Register URL building ───────────────────────────────────
+
+class TestBuildFrUrl:
+    """The search URL doubles as the Layer 1 cache key, so it must not drift."""
+
+    def test_exact_url(self) -> None:
+        url = _build_fr_url("https://www.federalregister.gov/api/v1/documents.json", "Japan technology & trade", 20)
+        assert url == (
+            "https://www.federalregister.gov/api/v1/documents.json"
+            "?conditions%5Bterm%5D=Japan+technology+%26+trade"
+            "&conditions%5Bpublication_date%5D%5Bgte%5D=2025-01-01"
+            "&per_page=20&page=1&order=newest"
+            "&fields%5B%5D=title&fields%5B%5D=abstract&fields%5B%5D=document_number"
+            "&fields%5B%5D=publication_date&fields%5B%5D=html_url&fields%5B%5D=type"
         )
 
-    def test_fact_sheet_phrase(self) -> None:
-        assert title_matches_watchlist("Fact Sheet: US-Japan Technology Partnership")
 
-    def test_summit_phrase(self) -> None:
-        assert title_matches_watchlist("US-Japan Summit Joint Statement")
+class TestWhiteHouseAndUSTRDates:
+    """Test publication-date extraction from article URLs."""
+
+    @pytest.mark.parametrize("url, expected", [
+        ("https://ustr.gov/about-us/policy-offices/press-office/press-releases/2025/may/us-uk-deal", "2025-05-01"),
+        ("https://ustr.gov/about-us/policy-offices/press-office/fact-sheets/2025/10/x", "2025-10-01"),
+        ("https://ustr.gov/trade-agreements/2025/spring/x", ""),
+    ])
+    def test_ustr(self, url: str, expected: str) -> None:
+        assert USTRScraper()._extract_date_from_url(url) == expected
+
+    def test_whitehouse(self) -> None:
+        scraper = WhiteHouseScraper()
+        assert scraper._extract_date_from_url("https://www.whitehouse.gov/fact-sheets/2025/09/x/") == "2025-09-01"
+        assert scraper._extract_date_from_url("https://www.whitehouse.gov/fact-sheets/x/") == ""
+
+
+# ── BaseScraper concurrency ────────────────────────────────────────
+
+class _StubScraper(BaseScraper):
+    def scrape(self) -> List[RawDeal]:
+        return []
+
+    def fetch_and_extract(self, url: str) -> str:
+        time.sleep(0.01 if url.endswith("0") else 0)
+        return url.upper()
+
+
+class TestBaseScraperConcurrency:
+    """Test concurrent fetching helpers (no network)."""
+
+    def test_fetch_many_preserves_order(self) -> None:
+        urls = [f"https://example.com/{i}" for i in range(12)]
+        assert _StubScraper().fetch_and_extract_many(urls) == [u.upper() for u in urls]
+
+    def test_federal_register_one_search_per_country(self, monkeypatch) -> None:
+        scraper = FederalRegisterScraper()
+        urls: List[str] = []
+
+        def fake_fetch_page(url: str) -> str:
+            urls.append(url)
+            return json.dumps({"count": 3, "results": [
+                {"document_number": "a", "title": "A"},
+                {"document_number": "b", "title": "B"},
+                {"document_number": "a", "title": "A again"},
+            ]})
+
+        monkeypatch.setattr(scraper, "fetch_page", fake_fetch_page)
+        deals = scraper._search_country(["Japan"], "JPN", SOURCES["federal_register"])
+        assert [d.source_id for d in deals] == ["FR-a", "FR-b"]
+        [url] = urls
+        assert "%28Japan+technology+trade%29+%7C+%28Japan+technology+prosperity+deal%29" in url
+        assert f"per_page={SOURCES['federal_register'].get('per_page', 20) * 3}" in url
+
+    def test_federal_register_scrape_keeps_watchlist_order(self, monkeypatch) -> None:
+        scraper = FederalRegisterScraper()
+
+        def fake_search(names, code, config) -> List[RawDeal]:
+            time.sleep(0.02 if code == next(iter(COUNTRY_WATCHLIST.values()))["code"] else 0)
+            return [RawDeal(title=code, source_url="https://x", source_name="federal_register")]
+
+        monkeypatch.setattr(scraper, "_search_country", fake_search)
+        assert [d.title for d in scraper.scrape()] == [c["code"] for c in COUNTRY_WATCHLIST.values()]
+
+    def test_scrapers_share_one_http_client(self) -> None:
+        a, b = _StubScraper(), _StubScraper()
+        try:
+            client = a._get_client()
+            assert b._get_client() is client
+            a.close()
+            assert not client.is_closed
+            assert a._get_client() is client
+        finally:
+            base.close_http_client()
+        assert client.is_closed
+        assert base.get_http_client() is not client
+        base.close_http_client()
+
+    def test_rate_limit_spaces_concurrent_callers(self, monkeypatch) -> None:
+        # Freeze the clock and record sleeps instead of timing real ones,
+        # so the spacing check can't flake on a loaded machine
+        monkeypatch.setattr("pipeline.scrapers.base.REQUEST_DELAY_SECONDS", 0.05)
+        monkeypatch.setattr("pipeline.scrapers.base.time.monotonic_ns", lambda: 1_000)
+        sleeps: List[float] = []
+        monkeypatch.setattr("pipeline.scrapers.base.time.sleep", sleeps.append)
+        scraper = _StubScraper()
+
+        threads = [
+            threading.Thread(target=scraper._rate_limit, args=("example.com",))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # One caller goes straight through; the rest wait for their own slot
+        assert sorted(sleeps) == pytest.approx([0.05, 0.10, 0.15])
+        assert scraper._next_request_ns["example.com"] == 1_000 + 4 * 50_000_000
@@ -6,20 +6,17 @@ Run with: PYTHONPATH=. python3 -m pytest tests/test_urls.py -v
 """
 from __future__ import annotations
 
-import json
 import re
-from pathlib import Path
-from urllib.parse import urlparse
+from functools import lru_cache
 
 import pytest
 
+from tests._helpers import DealsPartition
 
-# ── Fixtures ────────────────────────────────────────────────────────
 
-PROJECT_ROOT = Path(__file__).resolve().parent.parent
-DATA_DIR = PROJECT_ROOT / "data"
+# ── Fixtures ────────────────────────────────────────────────────────
 
-ALLOWED_DOMAINS = {
+ALLOWED_DOMAINS = frozenset({
     "www.whitehouse.gov",
     "whitehouse.gov",
     "www.commerce.gov",
@@ -28,17 +25,24 @@ ALLOWED_DOMAINS = {
     "www.ustr.gov",
     "www.federalregister.gov",
     "federalregister.gov",
-}
+})
+
 
+# Scheme and netloc are all these tests read, so skip urlparse's full split.
+# The netloc group stops where urlparse's does: at the first "/", "?" or "#".
+_URL_RE = re.compile(r"(https?)://([^/?#]+)")
 
-@pytest.fixture
-def deals_data() -> dict:
-    return json.loads((DATA_DIR / "deals.json").read_text())
 
+# Children reuse their parent's URLs, so most lookups repeat
+@lru_cache(maxsize=1024)
+def _domain(url: str) -> str:
+    """Netloc of an http(s) URL, or "" when the URL doesn't parse."""
+    m = _URL_RE.match(url)
+    return m.group(2) if m else ""
 
-@pytest.fixture
-def sample_data() -> dict:
-    return json.loads((DATA_DIR / "deals.sample.json").read_text())
+
+# deals_data / sample_data come from conftest.py: parsed once per session,
+# shared read-only across every test module.
 
 
 def _collect_all_urls(data: dict) -> list[tuple[str, str]]:
@@ -54,6 +58,22 @@ def _collect_all_urls(data: dict) -> list[tuple[str, str]]:
     return urls
 
 
+@pytest.fixture(scope="session")
+def all_urls(deals_data: dict) -> list[tuple[str, str]]:
+    """Each distinct URL in deals.json with its first context, collected once (don't mutate)."""
+    # Children repeat their parent's URLs, so most entries are duplicates
+    first_seen: dict[str, str] = {}
+    for deal_id, url in _collect_all_urls(deals_data):
+        first_seen.setdefault(url, deal_id)
+    return [(deal_id, url) for url, deal_id in first_seen.items()]
+
+
+@pytest.fixture(scope="session")
+def url_deal_ids(all_urls: list[tuple[str, str]]) -> dict[str, str]:
+    """Map each distinct URL to its first context, for failure messages."""
+    return {url: deal_id for deal_id, url in all_urls}
+
+
 # ── URL format tests ───────────────────────────────────────────────
 
 class TestUrlFormat:
@@ -74,64 +94,71 @@ class TestUrlFormat:
                     f"Deal {deal['id']} source_doc '{doc['label']}' not HTTPS: {url}"
                 )
 
-    def test_no_trailing_spaces_in_urls(self, deals_data: dict) -> None:
-        for deal_id, url in _collect_all_urls(deals_data):
+    def test_no_trailing_spaces_in_urls(self, all_urls: list[tuple[str, str]]) -> None:
+        for deal_id, url in all_urls:
             assert url == url.strip(), f"{deal_id} has URL with whitespace: '{url}'"
 
-    def test_urls_are_parseable(self, deals_data: dict) -> None:
-        for deal_id, url in _collect_all_urls(deals_data):
-            parsed = urlparse(url)
-            assert parsed.scheme in ("http", "https"), f"{deal_id}: bad scheme in {url}"
-            assert parsed.netloc, f"{deal_id}: missing netloc in {url}"
+    def test_urls_are_parseable(self, all_urls: list[tuple[str, str]]) -> None:
+        for deal_id, url in all_urls:
+            m = _URL_RE.match(url)
+            assert m is not None, f"{deal_id}: bad scheme in {url}"
+            assert m.group(2), f"{deal_id}: missing netloc in {url}"
 
 
 class TestUrlDomains:
     """Check that URLs point to known government domains."""
 
-    def test_source_urls_are_government_domains(self, deals_data: dict) -> None:
-        for deal in deals_data["items"]:
-            domain = urlparse(deal["source_url"]).netloc
-            assert domain in ALLOWED_DOMAINS, (
-                f"Deal {deal['id']} source_url has unexpected domain: {domain}"
-            )
-
-    def test_source_document_urls_are_government_domains(self, deals_data: dict) -> None:
-        for deal in deals_data["items"]:
-            for doc in deal.get("source_documents", []):
-                domain = urlparse(doc["url"]).netloc
-                assert domain in ALLOWED_DOMAINS, (
-                    f"Deal {deal['id']} source_doc '{doc['label']}' "
-                    f"has unexpected domain: {domain}"
-                )
+    def test_source_urls_are_government_domains(
+        self, deals_data: dict, url_deal_ids: dict[str, str],
+    ) -> None:
+        urls = {deal["source_url"] for deal in deals_data["items"]}
+        unexpected = sorted(
+            f"{url_deal_ids[url]}: {_domain(url)}"
+            for url in urls
+            if _domain(url) not in ALLOWED_DOMAINS
+        )
+        assert not unexpected, f"source_url has unexpected domains: {unexpected}"
+
+    def test_source_document_urls_are_government_domains(
+        self, deals_data: dict, url_deal_ids: dict[str, str],
+    ) -> None:
+        urls = {
+            doc["url"]
+            for deal in deals_data["items"]
+            for doc in deal.get("source_documents", [])
+        }
+        unexpected = sorted(
+            f"{url_deal_ids[url]}: {_domain(url)}"
+            for url in urls
+            if _domain(url) not in ALLOWED_DOMAINS
+        )
+        assert not unexpected, f"source_documents have unexpected domains: {unexpected}"
 
 
 class TestUrlConsistency:
     """Check URL consistency within and across data files."""
 
-    def test_child_deals_use_parent_urls(self, deals_data: dict) -> None:
+    def test_child_deals_use_parent_urls(self, deals_partition: DealsPartition) -> None:
         """Child deals should reference URLs that appear in parent source_documents."""
-        parent_urls: dict[str, set[str]] = {}
-        for deal in deals_data["items"]:
-            if deal.get("parent_id") is None:
-                urls = {deal["source_url"]}
-                for doc in deal.get("source_documents", []):
-                    urls.add(doc["url"])
-                parent_urls[deal["id"]] = urls
-
-        for deal in deals_data["items"]:
-            pid = deal.get("parent_id")
-            if pid and pid in parent_urls:
-                assert deal["source_url"] in parent_urls[pid], (
+        parent_urls = deals_partition.parent_urls
+        for deal in deals_partition.children:
+            pid = deal["parent_id"]
+            urls = parent_urls.get(pid)
+            # Orphaned children are reported by test_data_validation
+            if urls is not None:
+                assert deal["source_url"] in urls, (
                     f"Child {deal['id']} source_url {deal['source_url']} "
                     f"not in parent {pid} URLs"
                 )
 
     def test_no_duplicate_urls_in_source_documents(self, deals_data: dict) -> None:
-        for deal in deals_data["items"]:
-            urls = [doc["url"] for doc in deal.get("source_documents", [])]
-            assert len(urls) == len(set(urls)), (
-                f"Deal {deal['id']} has duplicate source_document URLs"
-            )
+        dups = [
+            deal["id"]
+            for deal in deals_data["items"]
+            if (urls := [doc["url"] for doc in deal.get("source_documents", [])])
+            and len(urls) != len(set(urls))
+        ]
+        assert not dups, f"Deals with duplicate source_document URLs: {dups}"
 
 
 class TestSampleUrlFormat:
@@ -146,7 +173,7 @@ class TestSampleUrlFormat:
 
     def test_sample_source_urls_are_government_domains(self, sample_data: dict) -> None:
         for deal in sample_data["items"]:
-            domain = urlparse(deal["source_url"]).netloc
+            domain = _domain(deal["source_url"])
             assert domain in ALLOWED_DOMAINS, (
                 f"Sample deal {deal['id']} has unexpected domain: {domain}"
             )
@@ -158,7 +185,7 @@ class TestSampleUrlFormat:
                 assert url.startswith("https://"), (
                     f"Sample {deal['id']} doc '{doc['label']}' not HTTPS: {url}"
                 )
-                domain = urlparse(url).netloc
+                domain = _domain(url)
                 assert domain in ALLOWED_DOMAINS, (
                     f"Sample {deal['id']} doc '{doc['label']}' bad domain: {domain}"
                 )